@@ -1,14 +1,43 @@
 import asyncio
 import json
-from typing import Dict, List, Optional, Union
-from dataclasses import dataclass
+import os
+import sys
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 import websockets
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from queue import PriorityQueue
 import traceback
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jarvis_assistant.agents.dependency_index import DependencyIndex  # noqa: E402
+from jarvis_assistant.agents.dispatcher import PriorityDispatcher, QueueFullError  # noqa: E402
+from jarvis_assistant.agents.http_client import PooledHTTPClient  # noqa: E402
+from jarvis_assistant.agents.model_cache import ModelCache, get_model_cache  # noqa: E402
+from jarvis_assistant.agents.resources import ResourcePool  # noqa: E402
+from jarvis_assistant.agents.status_batcher import StatusBatcher  # noqa: E402
+from jarvis_assistant.agents.task_results import TaskResultStore  # noqa: E402
+from jarvis_assistant.agents.task_trace import TraceRecorder, now  # noqa: E402
+from jarvis_assistant.agents.wire_protocol import (  # noqa: E402
+    codec_for,
+    decode_frame,
+    encode_frame,
+    supported_subprotocols,
+)
+from jarvis_assistant.agents.ws_multiplexer import RequestMultiplexer  # noqa: E402
+
+# Token pools shared by every task of an executor; db_conn matches the default
+# DatabasePool size so database-heavy tasks cannot exhaust its connections
+DEFAULT_RESOURCE_LIMITS = {"cpu": os.cpu_count() or 1, "db_conn": 20, "http": 50, "disk": 8}
+
+# Seconds a request may wait for its dependencies before it times out
+DEFAULT_DEPENDENCY_TIMEOUT = 300.0
+
+# Seconds to wait for the browser extension to answer a command
+DEFAULT_BROWSER_TIMEOUT = 30.0
+
 
 @dataclass
 class TaskContext:
@@ -19,20 +48,86 @@ class TaskContext:
     retry_count: int = 0
     max_retries: int = 3
     created_at: datetime = datetime.now()
+    resources: Dict[str, int] = field(default_factory=dict)
+    # Monotonic time (perf_counter_ns) the request was queued, for traces
+    enqueued_at: int = 0
 
 
 class TaskExecutor:
-    def __init__(self):
-        self.task_queue = PriorityQueue()
+    def __init__(
+        self,
+        resources: Optional[Union[Mapping[str, int], ResourcePool]] = None,
+        trace: bool = False,
+        workers: int = 4,
+        max_queue_depth: int = 100,
+        dependency_timeout: Optional[float] = DEFAULT_DEPENDENCY_TIMEOUT,
+        model_cache: Optional[ModelCache] = None,
+        preload_models: Iterable[str] = (),
+        http_client: Optional[PooledHTTPClient] = None,
+        result_store: Optional[TaskResultStore] = None,
+        status_interval: float = 0.05,
+        status_batch_size: int = 100,
+        binary_protocol: bool = False,
+    ):
+        # Pass the ResourcePool of a TaskDAG to draw on the same limits
+        if not isinstance(resources, ResourcePool):
+            resources = ResourcePool(resources if resources is not None else DEFAULT_RESOURCE_LIMITS)
+        self.resource_pool = resources
+
+        # Requests wait here, lowest priority value first, until one of the
+        # workers is free and their resource tokens are available; the
+        # websocket listener only enqueues them
+        self.task_queue = PriorityDispatcher(
+            self._run_queued,
+            workers,
+            max_queue_depth,
+            name="task_executor",
+            resources=resources,
+            requirements=lambda job: job[2].resources,
+        )
         self.active_tasks: Dict[str, asyncio.Task] = {}
-        self.task_results: Dict[str, any] = {}
+        # Results of completed tasks, looked up by dependent requests; bounded
+        # in memory, with older and larger results spilled to disk
+        self.task_results = result_store if result_store is not None else TaskResultStore()
+
+        # Requests deferred until the results of their dependencies arrive
+        self.dependency_timeout = dependency_timeout
+        self.pending_dependencies = DependencyIndex(on_timeout=self._dependencies_timed_out)
         self.executor = ThreadPoolExecutor(max_workers=10)
+
+        # Models stay loaded between ml_inference tasks; the cache is shared by
+        # every executor in the process unless one is passed in
+        self.model_cache = model_cache if model_cache is not None else get_model_cache()
+        self.preload_models = list(preload_models)
+
+        # Keep-alive connections reused by every api_call task
+        self.http_client = http_client if http_client is not None else PooledHTTPClient()
         self.ws = None
+        # Offer the binary frame protocol when connecting; the codec is None
+        # while the connection exchanges JSON text
+        self.binary_protocol = binary_protocol
+        self.codec: Optional[int] = None
         self.logger = logging.getLogger("TaskExecutor")
 
+        # Browser commands share the websocket with incoming task requests;
+        # listen_for_commands is its only reader and routes responses here
+        self.browser_requests = RequestMultiplexer(self._send_message)
+
+        # Status updates go out as one task_status_batch frame per interval,
+        # keeping only the latest status of each task
+        self.status_updates = StatusBatcher(self._send_status_batch, status_interval, status_batch_size)
+
+        # Queue-wait and attempt spans, exported with export_trace()
+        self.tracer = TraceRecorder() if trace else None
+
     async def connect_websocket(self):
         try:
-            self.ws = await websockets.connect("ws://localhost:8000/ws/task-executor/agents")
+            subprotocols = list(supported_subprotocols()) if self.binary_protocol else None
+            self.ws = await websockets.connect("ws://localhost:8000/ws/task-executor/agents", subprotocols=subprotocols)
+            self.codec = codec_for(self.ws.subprotocol)
+            self.task_queue.start()
+            if self.preload_models:
+                asyncio.create_task(self.model_cache.preload(self.preload_models, self.executor))
             asyncio.create_task(self.listen_for_commands())
         except Exception as e:
             self.logger.error(f"WebSocket connection failed: {e}")
@@ -41,11 +136,17 @@ class TaskExecutor:
         while True:
             try:
                 message = await self.ws.recv()
-                data = json.loads(message)
+                data = decode_frame(message) if isinstance(message, bytes) else json.loads(message)
+                if self.browser_requests.dispatch(data):
+                    continue
                 if data["message_type"] == "task_request":
                     await self.handle_task_request(data["content"])
                 elif data["message_type"] == "task_cancel":
                     await self.cancel_task(data["content"]["task_id"])
+            except websockets.exceptions.ConnectionClosed as e:
+                self.browser_requests.fail_all(ConnectionError(f"WebSocket connection closed: {e}"))
+                self.logger.error(f"Error in command listener: {e}")
+                await asyncio.sleep(5)
             except Exception as e:
                 self.logger.error(f"Error in command listener: {e}")
                 await asyncio.sleep(5)
@@ -56,37 +157,127 @@ class TaskExecutor:
             priority=content.get("priority", 5),
             dependencies=content.get("dependencies", []),
             timeout=content.get("timeout"),
+            resources=content.get("resources", {}),
         )
 
-        # Check dependencies
-        for dep in context.dependencies:
-            if dep not in self.task_results:
-                await self.send_status_update(context.task_id, "waiting_dependencies")
-                return
-
-        await self.execute_task(content["task_type"], content["parameters"], context)
+        try:
+            self.resource_pool.validate(context.resources)
+        except ValueError as e:
+            await self.send_status_update(context.task_id, "rejected", error=str(e))
+            return
+
+        # Defer the request until its missing dependencies complete
+        job = (content["task_type"], content["parameters"], context)
+        missing = [dep for dep in context.dependencies if dep not in self.task_results]
+        try:
+            timeout = content.get("dependency_timeout", self.dependency_timeout)
+            deferred = self.pending_dependencies.add(context.task_id, job, missing, timeout)
+        except ValueError as e:
+            await self.send_status_update(context.task_id, "rejected", error=str(e))
+            return
+        if deferred:
+            await self.send_status_update(context.task_id, "waiting_dependencies", missing=sorted(missing))
+            return
+
+        await self.enqueue_task(*job)
+
+    async def enqueue_task(self, task_type: str, parameters: Dict, context: TaskContext):
+        """Queue a task for the worker pool, rejecting it when the queue is full"""
+        if self.tracer is not None:
+            context.enqueued_at = now()
+        try:
+            waiting = self.task_queue.submit(context.task_id, (task_type, parameters, context), context.priority)
+        except (QueueFullError, ValueError) as e:
+            await self.send_status_update(context.task_id, "rejected", error=str(e))
+            return
+
+        if waiting:
+            await self.send_status_update(context.task_id, "queued", queue_depth=self.task_queue.depth)
+
+    async def _run_queued(self, job):
+        await self.execute_task(*job)
+
+    async def _release_dependents(self, task_id: str):
+        """Queue every deferred request whose last missing dependency was ``task_id``"""
+        for job in self.pending_dependencies.complete(task_id):
+            await self.enqueue_task(*job)
+
+    async def _fail_dependents(self, task_id: str):
+        """Fail deferred requests that depend on a task that failed, and their own dependents"""
+        failed = [task_id]
+        while failed:
+            dep = failed.pop()
+            for _, _, context in self.pending_dependencies.fail(dep):
+                await self.send_status_update(context.task_id, "failed", error=f"Dependency {dep} failed")
+                failed.append(context.task_id)
+
+    def _dependencies_timed_out(self, task_id: str, job, missing):
+        error = f"Dependencies not completed within the timeout: {', '.join(sorted(missing))}"
+        asyncio.create_task(self.send_status_update(task_id, "timeout", error=error))
+        asyncio.create_task(self._fail_dependents(task_id))
+
+    def queue_stats(self) -> Dict:
+        """Queue depth, worker usage and queue-wait statistics of the dispatcher"""
+        return self.task_queue.stats()
+
+    def result_stats(self) -> Dict:
+        """Hit, miss and spill counts and memory use of the task result store"""
+        return self.task_results.stats()
 
     async def execute_task(self, task_type: str, parameters: Dict, context: TaskContext):
+        task = None
         try:
             # Create task wrapper
-            task = asyncio.create_task(self._execute_task_with_timeout(task_type, parameters, context))
+            enqueued_at = context.enqueued_at or (now() if self.tracer is not None else 0)
+            context.enqueued_at = 0
+            task = asyncio.create_task(self._execute_task_with_timeout(task_type, parameters, context, enqueued_at))
             self.active_tasks[context.task_id] = task
 
             # Wait for task completion
             await task
 
+        except asyncio.CancelledError:
+            # cancel_task() cancelled the task itself; only propagate if this
+            # coroutine is being cancelled too (e.g. the worker is stopping)
+            if asyncio.current_task().cancelling():
+                raise
         except asyncio.TimeoutError:
             await self.send_status_update(
                 context.task_id, "timeout", error=f"Task exceeded timeout of {context.timeout}s"
             )
+            await self._fail_dependents(context.task_id)
         except Exception as e:
             if context.retry_count < context.max_retries:
                 context.retry_count += 1
                 await self.execute_task(task_type, parameters, context)
             else:
                 await self.send_status_update(context.task_id, "failed", error=str(e), traceback=traceback.format_exc())
+                await self._fail_dependents(context.task_id)
+        finally:
+            if self.active_tasks.get(context.task_id) is task:
+                del self.active_tasks[context.task_id]
+
+    async def _execute_task_with_timeout(
+        self, task_type: str, parameters: Dict, context: TaskContext, enqueued_at: int = 0
+    ):
+        # The dispatcher holds the task's resource tokens while it runs
+        tracer = self.tracer
+        if tracer is not None:
+            started = now()
+            attempt = {"attempt": context.retry_count + 1}
+            tracer.span("queue", context.task_id, "queue", enqueued_at or started, started, attempt)
 
-    async def _execute_task_with_timeout(self, task_type: str, parameters: Dict, context: TaskContext):
+        try:
+            await self._run_task(task_type, parameters, context)
+        except Exception as e:
+            if tracer is not None:
+                tracer.span(task_type, context.task_id, "run", started, now(), {**attempt, "error": str(e)})
+            raise
+        else:
+            if tracer is not None:
+                tracer.span(task_type, context.task_id, "run", started, now(), attempt)
+
+    async def _run_task(self, task_type: str, parameters: Dict, context: TaskContext):
         await self.send_status_update(context.task_id, "started")
 
         try:
@@ -105,17 +296,28 @@ class TaskExecutor:
             # Store and report results
             self.task_results[context.task_id] = result
             await self.send_status_update(context.task_id, "completed", result=result)
+            await self._release_dependents(context.task_id)
 
         except Exception as e:
             raise
 
     async def _execute_browser_task(self, parameters: Dict) -> Dict:
-        # Send command to browser extension
-        await self.ws.send(json.dumps({"message_type": "browser_command", "content": parameters}))
-
-        # Wait for response
-        response = await self.ws.recv()
-        return json.loads(response)["content"]
+        # Send command to browser extension and wait for the response that
+        # carries the same correlation id
+        response = await self.browser_requests.request(
+            {"sender": "task-executor", "message_type": "browser_command", "content": parameters},
+            timeout=parameters.get("timeout", DEFAULT_BROWSER_TIMEOUT),
+        )
+        content = response["content"]
+        if content.get("error"):
+            raise RuntimeError(f"Browser command failed: {content['error']}")
+        return content
+
+    async def _send_message(self, message: Dict):
+        if self.codec is None:
+            await self.ws.send(json.dumps(message))
+        else:
+            await self.ws.send(encode_frame(message, self.codec))
 
     async def _execute_file_task(self, parameters: Dict) -> Dict:
         operation = parameters["operation"]
@@ -133,54 +335,67 @@ class TaskExecutor:
             raise ValueError(f"Unknown file operation: {operation}")
 
     async def _execute_api_task(self, parameters: Dict) -> Dict:
-        import aiohttp
+        method = parameters["method"]
+        url = parameters["url"]
 
-        async with aiohttp.ClientSession() as session:
-            method = parameters["method"].lower()
-            url = parameters["url"]
-
-            async with getattr(session, method)(
-                url, json=parameters.get("data"), headers=parameters.get("headers", {})
-            ) as response:
-                return {"status": response.status, "data": await response.json()}
+        async with self.http_client.request(
+            method, url, json=parameters.get("data"), headers=parameters.get("headers", {})
+        ) as response:
+            return {"status": response.status, "data": await response.json()}
 
     async def _execute_ml_task(self, parameters: Dict) -> Dict:
-        # Execute in thread pool to avoid blocking
         model_name = parameters["model"]
         input_data = parameters["input"]
 
-        def run_inference(model_name: str, data: Union[str, Dict]):
-            # Import ML libraries lazily
-            import torch
-            from transformers import pipeline
-
-            # Load model and run inference
-            pipe = pipeline(model_name)
-            return pipe(data)
-
-        result = await asyncio.get_event_loop().run_in_executor(self.executor, run_inference, model_name, input_data)
+        # Loaded once and kept warm; load and inference run in the thread pool to avoid blocking
+        pipe = await self.model_cache.get(model_name, self.executor)
+        result = await asyncio.get_event_loop().run_in_executor(self.executor, pipe, input_data)
 
         return {"result": result}
 
+    def export_trace(self, path: str) -> int:
+        """Write the spans recorded since the last export as a Chrome trace file"""
+        if self.tracer is None:
+            raise RuntimeError("Tracing is disabled; create the TaskExecutor with trace=True")
+        count = self.tracer.export(path)
+        self.tracer.clear()
+        return count
+
+    async def shutdown(self, drain: bool = True):
+        """Stop the worker pool, by default after the queued tasks have run"""
+        await self.task_queue.stop(drain=drain)
+        await self.status_updates.close()
+        await self.http_client.close()
+        self.executor.shutdown(wait=False)
+        self.task_results.close()
+
     async def cancel_task(self, task_id: str):
-        if task_id in self.active_tasks:
+        if self.task_queue.cancel(task_id) or self.pending_dependencies.remove(task_id) is not None:
+            await self.send_status_update(task_id, "cancelled")
+        elif task_id in self.active_tasks:
             self.active_tasks[task_id].cancel()
             await self.send_status_update(task_id, "cancelled")
 
     async def send_status_update(self, task_id: str, status: str, **kwargs):
         if self.ws:
-            await self.ws.send(
-                json.dumps(
-                    {
-                        "message_type": "task_status",
-                        "content": {
-                            "task_id": task_id,
-                            "status": status,
-                            "timestamp": datetime.now().isoformat(),
-                            **kwargs,
-                        },
-                    }
-                )
+            self.status_updates.update(
+                task_id,
+                {
+                    "task_id": task_id,
+                    "status": status,
+                    "timestamp": datetime.now().isoformat(),
+                    **kwargs,
+                },
+            )
+
+    async def _send_status_batch(self, updates: List[Dict]):
+        if self.ws:
+            await self._send_message(
+                {
+                    "sender": "task-executor",
+                    "message_type": "task_status_batch",
+                    "content": {"updates": updates},
+                }
             )
 
 
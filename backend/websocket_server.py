@@ -1,28 +1,61 @@
 import asyncio
 import json
-from typing import Dict, Set
+import logging
+from typing import Dict, Optional, Set, Union
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
+from jarvis_assistant.agents.wire_protocol import codec_for, read_header, select_subprotocol, transcode
+
+logger = logging.getLogger("websocket_server")
+
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, Set[WebSocket]] = {"agents": set(), "browsers": set(), "interfaces": set()}
+        # Payload codec negotiated by each connection; None for JSON text
+        self.codecs: Dict[WebSocket, Optional[int]] = {}
 
     async def connect(self, websocket: WebSocket, client_type: str):
-        await websocket.accept()
+        subprotocol = select_subprotocol(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        self.codecs[websocket] = codec_for(subprotocol)
         self.active_connections[client_type].add(websocket)
 
     def disconnect(self, websocket: WebSocket, client_type: str):
         self.active_connections[client_type].remove(websocket)
+        self.codecs.pop(websocket, None)
 
-    async def broadcast_to_type(self, message: str, client_type: str):
+    async def broadcast_to_type(self, message: Union[str, bytes], client_type: str, encoded: Optional[Dict] = None):
+        # Convert the message at most once per encoding in use; binary frames
+        # go to binary connections as they are
+        encoded = {} if encoded is None else encoded
         for connection in self.active_connections[client_type]:
-            await connection.send_text(message)
+            await self.send(connection, message, encoded)
 
-    async def broadcast_to_all(self, message: str):
+    async def broadcast_to_all(self, message: Union[str, bytes]):
+        encoded = {}
         for client_type in self.active_connections:
-            await self.broadcast_to_type(message, client_type)
+            await self.broadcast_to_type(message, client_type, encoded)
+
+    async def send(self, connection: WebSocket, message: Union[str, bytes], encoded: Optional[Dict] = None):
+        codec = self.codecs.get(connection)
+        try:
+            if encoded is None:
+                data = transcode(message, codec)
+            elif codec in encoded:
+                data = encoded[codec]
+            else:
+                data = encoded[codec] = transcode(message, codec)
+        except Exception as e:
+            # A message one connection cannot take must not break the sender's socket
+            logger.warning(f"Dropped message that cannot be encoded for a connection: {e}")
+            return
+        # Messages without a frame header representation stay JSON text
+        if isinstance(data, str):
+            await connection.send_text(data)
+        else:
+            await connection.send_bytes(data)
 
 
 class Message(BaseModel):
@@ -30,6 +63,8 @@ class Message(BaseModel):
     message_type: str
     content: dict
     target: str = "all"
+    # Set on requests that expect a reply; the reply echoes it unchanged
+    correlation_id: Optional[str] = None
 
 
 app = FastAPI()
@@ -41,8 +76,17 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str, client_type:
     await manager.connect(websocket, client_type)
     try:
         while True:
-            data = await websocket.receive_text()
-            message = Message.parse_raw(data)
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            if frame.get("bytes") is not None:
+                # Binary frames are routed by their fixed header; the payload
+                # is only decoded if a JSON client has to receive it
+                data = frame["bytes"]
+                message = read_header(data)
+            else:
+                data = frame["text"]
+                message = Message.parse_raw(data)
 
             # Process message based on type
             if message.message_type == "agent_status":
@@ -54,19 +98,28 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str, client_type:
                 # Broadcast task updates to all
                 await manager.broadcast_to_all(data)
 
+            elif message.message_type == "task_status_batch":
+                # Status updates coalesced by the executor; content.updates
+                # holds the latest status of each task, forwarded as one frame
+                await manager.broadcast_to_type(data, "interfaces")
+
             elif message.message_type == "browser_command":
                 # Send commands to browser extensions
                 await manager.broadcast_to_type(data, "browsers")
 
+            elif message.message_type == "browser_response":
+                # Return command results to the agents; the sender matches
+                # them to its request by correlation_id
+                await manager.broadcast_to_type(data, "agents")
+
             elif message.message_type == "interface_action":
                 # Handle interface control actions
                 await manager.broadcast_to_type(data, "agents")
 
             elif message.message_type == "direct_message":
                 # Handle direct messages between agents
-                target_connections = manager.active_connections.get(message.target, set())
-                for conn in target_connections:
-                    await conn.send_text(data)
+                if message.target in manager.active_connections:
+                    await manager.broadcast_to_type(data, message.target)
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, client_type)
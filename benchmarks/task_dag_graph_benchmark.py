@@ -0,0 +1,89 @@
+"""Compare memory use and build/sort time of TaskDAG graph backends.
+
+Builds a layered DAG (every node depends on up to ``FAN_IN`` nodes of the previous
+layer) with networkx.DiGraph and with the CompactGraph backend used by TaskDAG,
+then times a topological sort of each.
+
+Usage:
+    python benchmarks/task_dag_graph_benchmark.py [sizes...]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import networkx as nx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jarvis_assistant.agents.dag_graph import CompactGraph  # noqa: E402
+
+LAYER_WIDTH = 100
+FAN_IN = 3
+
+
+def generate_edges(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    names = [f"task-{i}" for i in range(size)]
+    edges = []
+    for i in range(LAYER_WIDTH, size):
+        layer_start = (i // LAYER_WIDTH - 1) * LAYER_WIDTH
+        for dep in rng.sample(range(layer_start, layer_start + LAYER_WIDTH), FAN_IN):
+            edges.append((names[dep], names[i]))
+    return names, edges
+
+
+def build_networkx(names, edges):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(names)
+    graph.add_edges_from(edges)
+    return graph
+
+
+def build_compact(names, edges):
+    graph = CompactGraph()
+    for name in names:
+        graph.add_node(name)
+    for source, target in edges:
+        graph.add_edge(source, target)
+    graph.compact()
+    return graph
+
+
+def measure(build, sort, names, edges):
+    # Time and memory are measured in separate passes; tracemalloc slows
+    # allocation-heavy code down enough to distort the timings
+    start = time.perf_counter()
+    graph = build(names, edges)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sort(graph)
+    sort_time = time.perf_counter() - start
+    del graph
+
+    tracemalloc.start()
+    graph = build(names, edges)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return memory, build_time, sort_time
+
+
+def main(sizes):
+    print(f"{'nodes':>8} {'backend':>10} {'memory MiB':>11} {'build s':>9} {'toposort s':>11}")
+    for size in sizes:
+        names, edges = generate_edges(size)
+        backends = [
+            ("networkx", build_networkx, lambda g: list(nx.topological_sort(g))),
+            ("compact", build_compact, lambda g: g.topological_order()),
+        ]
+        for label, build, sort in backends:
+            memory, build_time, sort_time = measure(build, sort, names, edges)
+            print(f"{size:>8} {label:>10} {memory / 2**20:>11.2f} {build_time:>9.3f} {sort_time:>11.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,88 @@
+"""Compare JSON text messages with binary frames on encode/decode time and size.
+
+For each sample message prints the bytes on the wire and the per-message time
+to encode, to decode, and to route (what the backend parses before forwarding:
+the whole JSON document for text, only the fixed header for frames). Text
+routing in the backend also validates with pydantic, so its JSON figure is a
+lower bound. The msgpack rows are skipped if msgpack is not installed.
+
+Usage:
+    python benchmarks/wire_protocol_benchmark.py [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jarvis_assistant.agents import wire_protocol  # noqa: E402
+from jarvis_assistant.agents.wire_protocol import (  # noqa: E402
+    CODEC_JSON,
+    CODEC_MSGPACK,
+    decode_frame,
+    encode_frame,
+    read_header,
+)
+
+
+def sample_messages():
+    status = {
+        "task_id": "task-0",
+        "status": "completed",
+        "timestamp": "2026-01-01T12:00:00.000000",
+        "result": {"status_code": 200, "data": {"id": 1, "ok": True}},
+    }
+    return {
+        "status update": {
+            "sender": "task-executor",
+            "message_type": "task_status_batch",
+            "content": {"updates": [status]},
+        },
+        "100-update batch": {
+            "sender": "task-executor",
+            "message_type": "task_status_batch",
+            "content": {"updates": [{**status, "task_id": f"task-{i}"} for i in range(100)]},
+        },
+        "browser response": {
+            "sender": "browser-extension",
+            "message_type": "browser_response",
+            "target": "agents",
+            "correlation_id": uuid.uuid4().hex,
+            "content": {"success": True, "text": "lorem ipsum " * 4000, "links": [f"/page/{i}" for i in range(200)]},
+        },
+    }
+
+
+def per_call(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations):
+    encodings = [
+        ("json text", json.dumps, json.loads, json.loads),
+        ("frame/json", lambda m: encode_frame(m, CODEC_JSON), decode_frame, read_header),
+    ]
+    if wire_protocol.msgpack is not None:
+        encodings.append(("frame/msgpack", lambda m: encode_frame(m, CODEC_MSGPACK), decode_frame, read_header))
+    else:
+        print("msgpack not installed; skipping frame/msgpack\n")
+
+    print(f"{'message':>17} {'encoding':>14} {'bytes':>8} {'encode us':>10} {'decode us':>10} {'route us':>9}")
+    for label, message in sample_messages().items():
+        for name, encode, decode, route in encodings:
+            data = encode(message)
+            size = len(data.encode()) if isinstance(data, str) else len(data)
+            encode_time = per_call(encode, message, iterations)
+            decode_time = per_call(decode, data, iterations)
+            route_time = per_call(route, data, iterations)
+            print(f"{label:>17} {name:>14} {size:>8} {encode_time:>10.2f} {decode_time:>10.2f} {route_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -31,7 +31,7 @@ function connectWebSocket() {
 function handleWebSocketMessage(message: any) {
   switch (message.message_type) {
     case 'browser_command':
-      handleBrowserCommand(message.content);
+      handleBrowserCommand(message.content, message.correlation_id);
       break;
     case 'interface_action':
       handleInterfaceAction(message.content);
@@ -39,33 +39,44 @@ function handleWebSocketMessage(message: any) {
   }
 }
 
+// Reply to a browser command; the correlation id lets the sender match the
+// reply to its request while other commands are in flight
+function sendBrowserResponse(correlationId: string | undefined, content: any) {
+  socket?.send(JSON.stringify({
+    sender: 'browser-extension',
+    message_type: 'browser_response',
+    correlation_id: correlationId,
+    content
+  }));
+}
+
 // Handle browser commands
-function handleBrowserCommand(content: any) {
+function handleBrowserCommand(content: any, correlationId?: string) {
   switch (content.command) {
     case 'SCROLL_TO':
       window.scrollTo({
         top: content.position,
         behavior: 'smooth'
       });
+      sendBrowserResponse(correlationId, { command: 'SCROLL_TO', success: true });
       break;
       
     case 'CLICK_ELEMENT':
       const element = document.querySelector(content.selector);
       if (element) {
         (element as HTMLElement).click();
+        sendBrowserResponse(correlationId, { command: 'CLICK_ELEMENT', success: true });
+      } else {
+        sendBrowserResponse(correlationId, { command: 'CLICK_ELEMENT', error: `No element matches ${content.selector}` });
       }
       break;
       
     case 'EXTRACT_TEXT':
       const textContent = document.body.textContent;
-      socket?.send(JSON.stringify({
-        sender: 'browser-extension',
-        message_type: 'browser_response',
-        content: {
-          command: 'EXTRACT_TEXT',
-          text: textContent
-        }
-      }));
+      sendBrowserResponse(correlationId, {
+        command: 'EXTRACT_TEXT',
+        text: textContent
+      });
       break;
       
     case 'HIGHLIGHT_ELEMENT':
@@ -76,8 +87,14 @@ function handleBrowserCommand(content: any) {
         setTimeout(() => {
           (targetElement as HTMLElement).style.backgroundColor = originalBackground;
         }, 2000);
+        sendBrowserResponse(correlationId, { command: 'HIGHLIGHT_ELEMENT', success: true });
+      } else {
+        sendBrowserResponse(correlationId, { command: 'HIGHLIGHT_ELEMENT', error: `No element matches ${content.selector}` });
       }
       break;
+
+    default:
+      sendBrowserResponse(correlationId, { command: content.command, error: 'Unknown command' });
   }
 }
 
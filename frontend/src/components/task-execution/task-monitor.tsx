@@ -42,6 +42,8 @@ export function TaskMonitor() {
     const latestMessage = websocket.messages[websocket.messages.length - 1]
     if (latestMessage?.message_type === 'task_status') {
       updateTaskStatus(latestMessage.content)
+    } else if (latestMessage?.message_type === 'task_status_batch') {
+      latestMessage.content.updates.forEach(updateTaskStatus)
     }
   }, [websocket.messages])
 
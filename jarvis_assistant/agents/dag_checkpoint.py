@@ -0,0 +1,75 @@
+"""SQLite checkpoints of completed TaskDAG tasks."""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Union
+
+from .result_cache import deserialize_result, serialize_result
+
+
+class DAGCheckpoint:
+    """Persist the status and result of each completed task as it finishes
+
+    Rows are committed one task at a time so a crash loses at most the task
+    that was being written. The database runs in WAL mode to keep those
+    per-task commits cheap.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS task_checkpoints (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                result BLOB,
+                start_time TEXT,
+                end_time TEXT,
+                retry_count INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.conn.commit()
+
+    def save_task(self, task) -> None:
+        """Record a completed task; raises if its result cannot be serialized"""
+        payload = serialize_result(task.result)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO task_checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                task.task_id,
+                task.status,
+                payload,
+                task.start_time.isoformat() if task.start_time else None,
+                task.end_time.isoformat() if task.end_time else None,
+                task.retry_count,
+            ),
+        )
+        self.conn.commit()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return the checkpointed state of every completed task, keyed by task id"""
+        rows = self.conn.execute(
+            "SELECT task_id, status, result, start_time, end_time, retry_count FROM task_checkpoints"
+        )
+        return {
+            task_id: {
+                "status": status,
+                "result": deserialize_result(result),
+                "start_time": datetime.fromisoformat(start_time) if start_time else None,
+                "end_time": datetime.fromisoformat(end_time) if end_time else None,
+                "retry_count": retry_count,
+            }
+            for task_id, status, result, start_time, end_time, retry_count in rows
+        }
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM task_checkpoints")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,178 @@
+"""Compact array-backed directed graph used internally by TaskDAG."""
+
+from array import array
+from typing import Dict, Iterator, List, Sequence
+
+
+class CompactGraph:
+    """Directed graph over string node names stored as integer ids
+
+    Nodes are numbered in insertion order. Edges are kept in a CSR (compressed
+    sparse row) layout: ``_offsets[i]:_offsets[i + 1]`` slices the successors of
+    node ``i`` out of ``_targets``. Edges added after the last compaction live
+    in a small overlay and are folded into the CSR arrays once the overlay
+    outgrows the compacted graph, so insertion stays amortised O(1). Parallel
+    edges are not deduplicated; callers add each edge once.
+
+    The method names mirror the subset of ``networkx.DiGraph`` that TaskDAG uses.
+    """
+
+    __slots__ = (
+        "_index",
+        "_names",
+        "_in_degree",
+        "_out_degree",
+        "_offsets",
+        "_targets",
+        "_overlay",
+        "_overlay_edges",
+        "_edge_count",
+    )
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._in_degree = array("l")
+        self._out_degree = array("l")
+        self._offsets = array("l", [0])
+        self._targets = array("l")
+        self._overlay: Dict[int, List[int]] = {}
+        self._overlay_edges = 0
+        self._edge_count = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def add_node(self, name: str) -> int:
+        """Add a node if missing and return its integer id"""
+        node = self._index.get(name)
+        if node is None:
+            node = len(self._names)
+            self._index[name] = node
+            self._names.append(name)
+            self._in_degree.append(0)
+            self._out_degree.append(0)
+        return node
+
+    def add_edge(self, source: str, target: str) -> None:
+        """Add an edge, creating missing nodes"""
+        u = self._index.get(source)
+        if u is None:
+            u = self.add_node(source)
+        v = self._index.get(target)
+        if v is None:
+            v = self.add_node(target)
+        self._overlay.setdefault(u, []).append(v)
+        self._overlay_edges += 1
+        self._edge_count += 1
+        self._out_degree[u] += 1
+        self._in_degree[v] += 1
+
+        if self._overlay_edges > max(1024, len(self._targets), len(self._names)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold overlay edges into the CSR arrays"""
+        if not self._overlay_edges and len(self._offsets) == len(self._names) + 1:
+            return
+
+        node_count = len(self._names)
+        offsets = array("l", [0]) * (node_count + 1)
+        for node in range(node_count):
+            offsets[node + 1] = offsets[node] + self._out_degree[node]
+
+        targets = array("l", [0]) * self._edge_count
+        compacted_nodes = len(self._offsets) - 1
+        for node in range(node_count):
+            position = offsets[node]
+            if node < compacted_nodes:
+                start, end = self._offsets[node], self._offsets[node + 1]
+                targets[position : position + end - start] = self._targets[start:end]
+                position += end - start
+            for target in self._overlay.get(node, ()):
+                targets[position] = target
+                position += 1
+
+        self._offsets = offsets
+        self._targets = targets
+        self._overlay = {}
+        self._overlay_edges = 0
+
+    def index(self, name: str) -> int:
+        """Return the integer id of a node"""
+        return self._index[name]
+
+    def name(self, node: int) -> str:
+        """Return the name of an integer node id"""
+        return self._names[node]
+
+    def successor_ids(self, node: int) -> Sequence[int]:
+        """Return the successor ids of an integer node id"""
+        if node + 1 < len(self._offsets):
+            compacted = self._targets[self._offsets[node] : self._offsets[node + 1]]
+        else:
+            compacted = array("l")
+        extra = self._overlay.get(node)
+        if extra:
+            return compacted.tolist() + extra
+        return compacted
+
+    def in_degrees(self) -> array:
+        """Return a copy of the in-degree of every node, indexed by id"""
+        return array("l", self._in_degree)
+
+    def has_node(self, name: str) -> bool:
+        return name in self._index
+
+    def has_edge(self, source: str, target: str) -> bool:
+        if source not in self._index or target not in self._index:
+            return False
+        return self._index[target] in self.successor_ids(self._index[source])
+
+    def successors(self, name: str) -> Iterator[str]:
+        return (self._names[node] for node in self.successor_ids(self._index[name]))
+
+    def in_degree(self, name: str) -> int:
+        return self._in_degree[self._index[name]]
+
+    def out_degree(self, name: str) -> int:
+        return self._out_degree[self._index[name]]
+
+    def number_of_nodes(self) -> int:
+        return len(self._names)
+
+    def number_of_edges(self) -> int:
+        return self._edge_count
+
+    def topological_order(self) -> List[int]:
+        """Return node ids in a topological order (Kahn's algorithm)"""
+        self.compact()
+        remaining = self.in_degrees()
+        order = [node for node in range(len(self._names)) if remaining[node] == 0]
+        offsets, targets = self._offsets, self._targets
+        for node in order:
+            for position in range(offsets[node], offsets[node + 1]):
+                target = targets[position]
+                remaining[target] -= 1
+                if remaining[target] == 0:
+                    order.append(target)
+
+        if len(order) != len(self._names):
+            raise ValueError("Graph contains cycles")
+        return order
+
+    def to_networkx(self):
+        """Export the graph as a ``networkx.DiGraph``"""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self._names)
+        for node, name in enumerate(self._names):
+            graph.add_edges_from((name, self._names[target]) for target in self.successor_ids(node))
+        return graph
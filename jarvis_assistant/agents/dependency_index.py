@@ -0,0 +1,110 @@
+"""Index of deferred tasks keyed by the dependencies they are still waiting for."""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+
+class _Waiting:
+    __slots__ = ("key", "item", "missing", "timer")
+
+    def __init__(self, key: Hashable, item: Any, missing: Set[Hashable]):
+        self.key = key
+        self.item = item
+        self.missing = missing
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class DependencyIndex:
+    """Hold tasks until their last outstanding dependency completes
+
+    Each dependency id maps to the set of tasks waiting on it, and each task
+    counts the dependencies it still misses, so :meth:`complete` only touches
+    the direct waiters of the finished dependency. A task that is still waiting
+    after its timeout is dropped and handed to ``on_timeout``.
+    """
+
+    def __init__(self, on_timeout: Optional[Callable[[Hashable, Any, Set[Hashable]], None]] = None):
+        self.on_timeout = on_timeout
+        self._waiting: Dict[Hashable, _Waiting] = {}
+        self._waiters: Dict[Hashable, Set[_Waiting]] = {}
+
+    def __len__(self) -> int:
+        return len(self._waiting)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._waiting
+
+    def add(self, key: Hashable, item: Any, missing: Iterable[Hashable], timeout: Optional[float] = None) -> bool:
+        """Defer ``item`` until every dependency in ``missing`` completes
+
+        Returns False without deferring anything if ``missing`` is empty, i.e.
+        the item is ready to run now. Timeouts need a running event loop.
+        """
+        missing = set(missing)
+        if not missing:
+            return False
+        if key in self._waiting:
+            raise ValueError(f"Task {key} is already waiting for dependencies")
+
+        entry = _Waiting(key, item, missing)
+        self._waiting[key] = entry
+        for dep in missing:
+            self._waiters.setdefault(dep, set()).add(entry)
+        if timeout is not None:
+            entry.timer = asyncio.get_running_loop().call_later(timeout, self._expire, entry)
+        return True
+
+    def complete(self, dependency: Hashable) -> List[Any]:
+        """Record a completed dependency and return the items it released, in no particular order"""
+        released = []
+        for entry in self._waiters.pop(dependency, ()):
+            entry.missing.discard(dependency)
+            if not entry.missing:
+                self._drop(entry)
+                released.append(entry.item)
+        return released
+
+    def fail(self, dependency: Hashable) -> List[Any]:
+        """Drop and return every item waiting on a dependency that will never complete"""
+        dropped = []
+        for entry in list(self._waiters.get(dependency, ())):
+            self._unlink(entry)
+            self._drop(entry)
+            dropped.append(entry.item)
+        return dropped
+
+    def remove(self, key: Hashable) -> Optional[Any]:
+        """Stop waiting for a task and return its item, or None if it is not waiting"""
+        entry = self._waiting.get(key)
+        if entry is None:
+            return None
+        self._unlink(entry)
+        self._drop(entry)
+        return entry.item
+
+    def missing(self, key: Hashable) -> Set[Hashable]:
+        """Return the dependencies a waiting task still needs"""
+        return set(self._waiting[key].missing)
+
+    def _unlink(self, entry: _Waiting) -> None:
+        for dep in entry.missing:
+            waiters = self._waiters.get(dep)
+            if waiters is not None:
+                waiters.discard(entry)
+                if not waiters:
+                    del self._waiters[dep]
+
+    def _drop(self, entry: _Waiting) -> None:
+        del self._waiting[entry.key]
+        if entry.timer is not None:
+            entry.timer.cancel()
+
+    def _expire(self, entry: _Waiting) -> None:
+        if self._waiting.get(entry.key) is not entry:
+            return
+        missing = set(entry.missing)
+        entry.timer = None
+        self._unlink(entry)
+        self._drop(entry)
+        if self.on_timeout is not None:
+            self.on_timeout(entry.key, entry.item, missing)
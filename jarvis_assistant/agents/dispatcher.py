@@ -0,0 +1,210 @@
+"""Bounded asyncio priority queue drained by a fixed pool of worker coroutines."""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .resources import ResourcePool
+
+# Registered once per process and labelled by dispatcher name
+QUEUE_DEPTH = Gauge("task_dispatcher_queue_depth", "Jobs waiting for a worker", ["dispatcher"])
+QUEUE_WAIT = Histogram("task_dispatcher_queue_wait_seconds", "Time jobs spent queued", ["dispatcher"])
+BUSY_WORKERS = Gauge("task_dispatcher_busy_workers", "Workers running a job", ["dispatcher"])
+REJECTED_JOBS = Counter("task_dispatcher_rejected_total", "Jobs rejected because the queue was full", ["dispatcher"])
+
+
+class QueueFullError(RuntimeError):
+    """Raised by :meth:`PriorityDispatcher.submit` when the queue is at its depth limit"""
+
+
+class PriorityDispatcher:
+    """Run submitted jobs on ``workers`` coroutines, lowest priority value first
+
+    Jobs of equal priority run in submission order. At most ``max_queue_depth``
+    jobs wait at once; further submissions raise :class:`QueueFullError` so the
+    caller can push back on its client instead of buffering without bound.
+    Errors raised by the handler are logged and do not stop the worker.
+
+    With a ``resources`` pool, ``requirements(job)`` names the tokens a job
+    needs. A worker only takes a job once all of them are free and holds them
+    while the handler runs; a job whose tokens are exhausted is set aside
+    without occupying a worker, so jobs needing other resources run meanwhile,
+    and is queued again when tokens are released.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        workers: int = 4,
+        max_queue_depth: int = 100,
+        name: str = "default",
+        resources: Optional[ResourcePool] = None,
+        requirements: Optional[Callable[[Any], Mapping[str, int]]] = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_queue_depth < 1:
+            raise ValueError("max_queue_depth must be at least 1")
+
+        self.handler = handler
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.name = name
+        self.resources = resources
+        self.requirements = requirements
+        self.logger = logging.getLogger("PriorityDispatcher")
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        # Sequence number of each queued job; entries of cancelled jobs stay in
+        # the heap and are skipped when their sequence number no longer matches
+        self._queued: Dict[Hashable, int] = {}
+        # Queue entries whose resource tokens were exhausted when popped
+        self._parked: List[Tuple] = []
+        self._unpark_task: Optional[asyncio.Task] = None
+        self.busy = 0
+
+        # Totals since start, for stats()
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._rejected = 0
+
+        self._depth_gauge = QUEUE_DEPTH.labels(dispatcher=name)
+        self._wait_histogram = QUEUE_WAIT.labels(dispatcher=name)
+        self._busy_gauge = BUSY_WORKERS.labels(dispatcher=name)
+        self._rejected_counter = REJECTED_JOBS.labels(dispatcher=name)
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return len(self._queued)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the worker coroutines on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers, first letting them finish queued jobs when ``drain`` is set"""
+        if not self._tasks:
+            return
+        if drain:
+            await self._queue.join()
+        if self._unpark_task is not None:
+            self._tasks.append(self._unpark_task)
+            self._unpark_task = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queued.clear()
+        self._parked.clear()
+        self._depth_gauge.set(0)
+
+    def submit(self, key: Hashable, job: Any, priority: int = 5) -> bool:
+        """Queue a job and return whether it has to wait for a busy worker
+
+        ``key`` identifies the job for :meth:`cancel` and must be unique among
+        queued jobs.
+        """
+        if self._queue is None:
+            raise RuntimeError("Dispatcher is not started")
+        if key in self._queued:
+            raise ValueError(f"Job {key} is already queued")
+        if len(self._queued) >= self.max_queue_depth:
+            self._rejected += 1
+            self._rejected_counter.inc()
+            raise QueueFullError(f"Queue is full ({self.max_queue_depth} jobs waiting)")
+
+        sequence = self._queued[key] = next(self._sequence)
+        self._queue.put_nowait((priority, sequence, time.monotonic(), key, job))
+        self._depth_gauge.set(len(self._queued))
+        return len(self._queued) > self.workers - self.busy
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drop a queued job before it starts; returns False if it is not queued"""
+        if self._queued.pop(key, None) is None:
+            return False
+        self._depth_gauge.set(len(self._queued))
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            entry = await self._queue.get()
+            _, sequence, enqueued, key, job = entry
+            parked = False
+            try:
+                if self._queued.get(key) != sequence:
+                    continue
+
+                requirements = self.requirements(job) if self.resources is not None else None
+                if requirements and not self.resources.try_acquire(requirements):
+                    self._park(entry)
+                    parked = True
+                    continue
+
+                del self._queued[key]
+                self._depth_gauge.set(len(self._queued))
+                self._record_wait(time.monotonic() - enqueued)
+
+                self.busy += 1
+                self._busy_gauge.inc()
+                try:
+                    await self.handler(job)
+                except Exception as e:
+                    self.logger.error(f"Job {key} failed in dispatcher {self.name}: {e}")
+                finally:
+                    self.busy -= 1
+                    self._busy_gauge.dec()
+                    if requirements:
+                        self.resources.release(requirements)
+            finally:
+                # A parked entry stays unfinished, so stop(drain=True) waits for it
+                if not parked:
+                    self._queue.task_done()
+
+    def _park(self, entry: Tuple) -> None:
+        self._parked.append(entry)
+        if self._unpark_task is None:
+            # Wait on a future taken now, so a release before the task starts is not missed
+            self._unpark_task = asyncio.create_task(self._unpark(self.resources.released()))
+
+    async def _unpark(self, released: asyncio.Future) -> None:
+        """Queue parked jobs again the next time any resource tokens are released"""
+        await released
+        parked, self._parked = self._parked, []
+        self._unpark_task = None
+        for entry in parked:
+            self._queue.put_nowait(entry)
+            self._queue.task_done()
+
+    def _record_wait(self, wait: float) -> None:
+        self._waits += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._wait_histogram.observe(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, worker usage and queue-wait totals"""
+        return {
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_queue_depth,
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "rejected": self._rejected,
+            "dispatched": self._waits,
+            "mean_wait": self._wait_total / self._waits if self._waits else 0.0,
+            "max_wait": self._wait_max,
+        }
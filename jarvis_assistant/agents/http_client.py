@@ -0,0 +1,117 @@
+"""Long-lived, connection-pooled HTTP client shared by api_call tasks."""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class PooledHTTPClient:
+    """One ``aiohttp.ClientSession`` kept open for the life of its owner
+
+    Connections are kept alive and reused per host, so repeated calls to the
+    same API skip the TCP and TLS handshakes. ``limit`` caps open connections
+    overall and ``limit_per_host`` per host; DNS answers are cached for
+    ``dns_cache_ttl`` seconds. ``request_timeout`` caps the total time of a
+    request in seconds; by default aiohttp's own timeout applies. The session
+    is created on first use, and :meth:`close` waits for in-flight requests
+    before closing it.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        request_timeout: Optional[float] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.logger = logging.getLogger("PooledHTTPClient")
+
+        self._session = None
+        self._idle: Optional[asyncio.Event] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    def _get_session(self):
+        if self.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+
+            # Count new connections against reused ones to report handshakes saved
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_created)
+            trace.on_connection_reuseconn.append(self._on_connection_reused)
+
+            options = {}
+            if self.request_timeout is not None:
+                options["timeout"] = aiohttp.ClientTimeout(total=self.request_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace], **options)
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._session
+
+    async def _on_connection_created(self, session, context, params) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params) -> None:
+        self.connections_reused += 1
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[Any]:
+        """Send a request over the shared pool and yield the response"""
+        session = self._get_session()
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self._idle.clear()
+        try:
+            async with session.request(method.upper(), url, **kwargs) as response:
+                yield response
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def close(self, grace_period: float = 10.0) -> None:
+        """Close the pool once in-flight requests finish or ``grace_period`` expires"""
+        if self.closed:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=grace_period)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Closing HTTP pool with {self.in_flight} requests still in flight")
+        await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Report handshakes saved by connection reuse and how busy the pool is"""
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "handshakes_saved": self.connections_reused,
+            "reuse_ratio": self.connections_reused / connections if connections else 0.0,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": self.in_flight / self.limit if self.limit else 0.0,
+        }
@@ -0,0 +1,155 @@
+"""Process-wide cache of loaded ML models with a memory budget."""
+
+import asyncio
+import logging
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Budget of the shared cache; override with JARVIS_MODEL_CACHE_BYTES
+DEFAULT_MODEL_CACHE_BYTES = int(os.environ.get("JARVIS_MODEL_CACHE_BYTES", 4 * 1024 * 1024 * 1024))
+
+
+def load_pipeline(model_name: str) -> Any:
+    """Default loader: a transformers pipeline for the task or model name"""
+    from transformers import pipeline
+
+    return pipeline(model_name)
+
+
+def estimate_model_bytes(model: Any) -> int:
+    """Estimate the memory held by a model from its parameter and buffer tensors
+
+    Pipelines are measured through their ``model`` attribute. Objects without
+    tensors fall back to ``sys.getsizeof``.
+    """
+    module = getattr(model, "model", model)
+    total = 0
+    for attribute in ("parameters", "buffers"):
+        tensors = getattr(module, attribute, None)
+        if callable(tensors):
+            total += sum(tensor.numel() * tensor.element_size() for tensor in tensors())
+    return total or sys.getsizeof(model)
+
+
+class ModelCache:
+    """LRU cache of loaded models bounded by their estimated total size
+
+    Models load in ``executor`` (the default thread pool if None) so the event
+    loop keeps running. Concurrent requests for a model that is still loading
+    wait for that single load instead of starting their own. When the budget
+    is exceeded, the least recently used models are dropped; a model larger
+    than the whole budget is still returned and kept until the next load.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MODEL_CACHE_BYTES,
+        loader: Callable[[str], Any] = load_pipeline,
+        sizer: Callable[[Any], int] = estimate_model_bytes,
+    ):
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.sizer = sizer
+        self.size = 0
+        self.logger = logging.getLogger("ModelCache")
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, model_name: str) -> bool:
+        return model_name in self._models
+
+    async def get(self, model_name: str, executor: Optional[Executor] = None) -> Any:
+        """Return a loaded model, loading it at most once across concurrent callers"""
+        model = self._models.get(model_name)
+        if model is not None:
+            self._models.move_to_end(model_name)
+            self.hits += 1
+            return model
+
+        load = self._loading.get(model_name)
+        if load is None:
+            self.misses += 1
+            load = self._loading[model_name] = asyncio.ensure_future(self._load(model_name, executor))
+        else:
+            self.coalesced += 1
+
+        # A cancelled caller must not cancel a load other callers are waiting on
+        return await asyncio.shield(load)
+
+    async def _load(self, model_name: str, executor: Optional[Executor]) -> Any:
+        try:
+            model = await asyncio.get_running_loop().run_in_executor(executor, self.loader, model_name)
+            size = self.sizer(model)
+            self._store(model_name, model, size)
+            self.logger.info(f"Loaded model {model_name} ({size / 2**20:.1f} MiB)")
+            return model
+        finally:
+            del self._loading[model_name]
+
+    def _store(self, model_name: str, model: Any, size: int) -> None:
+        self._discard(model_name)
+        self._models[model_name] = model
+        self._sizes[model_name] = size
+        self.size += size
+
+        while self.size > self.max_bytes and len(self._models) > 1:
+            evicted = next(iter(self._models))
+            self._discard(evicted)
+            self.evictions += 1
+            self.logger.info(f"Evicted model {evicted} to stay within the cache budget")
+
+    def _discard(self, model_name: str) -> None:
+        if self._models.pop(model_name, None) is not None:
+            self.size -= self._sizes.pop(model_name)
+
+    async def preload(self, model_names: Iterable[str], executor: Optional[Executor] = None) -> None:
+        """Load models ahead of their first request; failures are logged, not raised"""
+        model_names = list(model_names)
+        results = await asyncio.gather(
+            *(self.get(name, executor) for name in model_names), return_exceptions=True
+        )
+        for name, result in zip(model_names, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to preload model {name}: {result}")
+
+    def evict(self, model_name: str) -> None:
+        self._discard(model_name)
+
+    def clear(self) -> None:
+        self._models.clear()
+        self._sizes.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": list(self._models),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+
+_shared_cache: Optional[ModelCache] = None
+
+
+def get_model_cache() -> ModelCache:
+    """Return the process-wide model cache, creating it on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ModelCache()
+    return _shared_cache
@@ -0,0 +1,90 @@
+"""Named token pools that bound how many tasks use each contended resource."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Mapping, Optional
+
+
+class ResourcePool:
+    """Counted tokens for named resources such as ``{"cpu": 4, "db_conn": 20}``
+
+    A task declares what it needs (e.g. ``{"cpu": 2, "db_conn": 1}``) and is
+    admitted only when every named resource has enough free tokens; all of its
+    tokens are taken at once, so a task never holds part of its requirements
+    while waiting for the rest. One pool may be shared by several TaskDAGs and
+    TaskExecutors so they draw on the same limits. Use a pool from a single
+    event loop.
+    """
+
+    def __init__(self, capacities: Mapping[str, int]):
+        for name, capacity in capacities.items():
+            if capacity < 1:
+                raise ValueError(f"Resource {name} must have a capacity of at least 1")
+
+        self.capacities: Dict[str, int] = dict(capacities)
+        self.available: Dict[str, int] = dict(capacities)
+        self._waiters: List[asyncio.Future] = []
+
+    def validate(self, requirements: Mapping[str, int]) -> None:
+        """Raise ValueError if the requirements could never be satisfied"""
+        for name, amount in requirements.items():
+            if name not in self.capacities:
+                raise ValueError(f"Unknown resource: {name}")
+            if amount < 0:
+                raise ValueError(f"Resource {name} requirement must not be negative")
+            if amount > self.capacities[name]:
+                raise ValueError(
+                    f"Resource {name} requirement {amount} exceeds its capacity of {self.capacities[name]}"
+                )
+
+    def try_acquire(self, requirements: Mapping[str, int]) -> bool:
+        """Take every required token if all are free; take nothing otherwise"""
+        available = self.available
+        for name, amount in requirements.items():
+            if available[name] < amount:
+                return False
+        for name, amount in requirements.items():
+            available[name] -= amount
+        return True
+
+    async def acquire(self, requirements: Mapping[str, int]) -> None:
+        """Wait until every required token is free, then take them all"""
+        self.validate(requirements)
+        while not self.try_acquire(requirements):
+            await self.released()
+
+    def release(self, requirements: Mapping[str, int]) -> None:
+        """Return tokens taken by :meth:`try_acquire` or :meth:`acquire`"""
+        for name, amount in requirements.items():
+            self.available[name] += amount
+
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def released(self) -> asyncio.Future:
+        """Return a future resolved the next time any tokens are released"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    @asynccontextmanager
+    async def reserve(self, requirements: Optional[Mapping[str, int]]) -> AsyncIterator[None]:
+        """Hold the required tokens for the duration of the block"""
+        if not requirements:
+            yield
+            return
+
+        await self.acquire(requirements)
+        try:
+            yield
+        finally:
+            self.release(requirements)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return the capacity and free tokens of every resource"""
+        return {
+            name: {"capacity": capacity, "available": self.available[name]}
+            for name, capacity in self.capacities.items()
+        }
@@ -0,0 +1,239 @@
+"""Content-addressed stores for memoized TaskDAG results."""
+
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+PICKLE_PROTOCOL = 4
+
+
+class ResultStore:
+    """Interface for memoized result stores
+
+    Values are serialized result bytes keyed by a hex digest. Implementations
+    evict least recently used entries once ``max_bytes`` is exceeded.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryResultStore(ResultStore):
+    """In-process LRU store bounded by total payload size"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+
+        self._entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+class DiskResultStore(ResultStore):
+    """Directory-backed LRU store bounded by total file size
+
+    Each entry is one file named after its key. Access order is tracked in
+    memory and seeded from file modification times, so the store survives
+    process restarts.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+
+        existing = sorted(self.directory.glob("*.result"), key=lambda path: path.stat().st_mtime)
+        for path in existing:
+            file_size = path.stat().st_size
+            self._entries[path.stem] = file_size
+            self.size += file_size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.result"
+
+    def get(self, key: str) -> Optional[bytes]:
+        if key not in self._entries:
+            return None
+
+        try:
+            value = self._path(key).read_bytes()
+        except FileNotFoundError:
+            self.size -= self._entries.pop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        os.utime(self._path(key))
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        os.replace(temp_path, self._path(key))
+
+        if key in self._entries:
+            self.size -= self._entries.pop(key)
+        self._entries[key] = len(value)
+        self.size += len(value)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes:
+            key, file_size = self._entries.popitem(last=False)
+            self.size -= file_size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+        self._entries.clear()
+        self.size = 0
+
+
+def function_identity(func: Callable) -> str:
+    """Identify a callable by qualified name, bytecode and bound state
+
+    Edits to the function invalidate cached results, and closure cells,
+    defaults, a bound ``self`` and the frozen arguments of a
+    ``functools.partial`` are hashed too, so two closures built by one factory
+    get different identities. Raises whatever pickle raises if that state
+    cannot be serialized.
+    """
+    target = func.func if isinstance(func, functools.partial) else func
+    target = getattr(target, "__func__", target)
+    name = f"{getattr(target, '__module__', '')}.{getattr(target, '__qualname__', type(target).__qualname__)}"
+    hasher = hashlib.sha256()
+    _hash_callable(hasher, func, set())
+    return f"{name}:{hasher.hexdigest()}"
+
+
+def _hash_callable(hasher: "hashlib._Hash", func: Callable, seen: set) -> None:
+    # Recursive closures and wrappers refer back to functions already hashed
+    if id(func) in seen:
+        hasher.update(b"<recursive>")
+        return
+    seen.add(id(func))
+
+    if isinstance(func, functools.partial):
+        _hash_callable(hasher, func.func, seen)
+        _hash_value(hasher, func.args, seen)
+        _hash_value(hasher, sorted(func.keywords.items()), seen)
+    elif isinstance(func, types.MethodType):
+        _hash_callable(hasher, func.__func__, seen)
+        hasher.update(pickle.dumps(func.__self__, protocol=PICKLE_PROTOCOL))
+    elif isinstance(func, types.FunctionType):
+        hasher.update(f"{func.__module__}.{func.__qualname__}".encode())
+        _hash_code(hasher, func.__code__)
+        for cell in func.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                hasher.update(b"<empty cell>")
+                continue
+            _hash_value(hasher, contents, seen)
+        _hash_value(hasher, func.__defaults__, seen)
+        _hash_value(hasher, sorted((func.__kwdefaults__ or {}).items()), seen)
+    else:
+        # Builtins pickle by reference, callable objects with their state
+        hasher.update(pickle.dumps(func, protocol=PICKLE_PROTOCOL))
+
+
+def _hash_code(hasher: "hashlib._Hash", code: types.CodeType) -> None:
+    # Comprehensions, lambdas and inner functions are code objects in co_consts
+    hasher.update(code.co_code + repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(hasher, const)
+        else:
+            hasher.update(repr(const).encode())
+
+
+def _hash_value(hasher: "hashlib._Hash", value: Any, seen: set) -> None:
+    if isinstance(value, (types.FunctionType, types.MethodType, functools.partial)):
+        _hash_callable(hasher, value, seen)
+    else:
+        hasher.update(pickle.dumps(value, protocol=PICKLE_PROTOCOL))
+
+
+def serialize_result(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+
+
+def deserialize_result(payload: bytes) -> Any:
+    return pickle.loads(payload)
+
+
+def payload_digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def result_digest(value: Any) -> str:
+    """Hash a result by its pickled content"""
+    return payload_digest(serialize_result(value))
+
+
+def cache_key(func: Callable, args: Iterable, kwargs: Dict[str, Any], dep_digests: Dict[str, str]) -> str:
+    """Build the memoization key of a task invocation
+
+    Raises whatever pickle raises if an argument cannot be serialized.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(function_identity(func).encode())
+    hasher.update(pickle.dumps(tuple(args), protocol=PICKLE_PROTOCOL))
+    hasher.update(pickle.dumps(sorted(kwargs.items()), protocol=PICKLE_PROTOCOL))
+    for dep, digest in sorted(dep_digests.items()):
+        hasher.update(f"{dep}={digest}".encode())
+    return hasher.hexdigest()
@@ -0,0 +1,185 @@
+"""Zero-copy hand-off of large TaskDAG results to process-pool tasks.
+
+Large ``bytes``-like and NumPy array results are copied once into a
+``multiprocessing.shared_memory`` segment (or a memory-mapped spill file) and
+passed to process tasks as small picklable :class:`SharedResult` handles. The
+worker maps the same memory and hands the task a read-only view, so the payload
+never travels through the pool's pipe.
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+def _is_ndarray(value: Any) -> bool:
+    return type(value).__module__ == "numpy" and hasattr(value, "__array_interface__")
+
+
+def shareable_size(value: Any) -> int:
+    """Return the payload size of a value that can be shared, or 0 if it cannot"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview) and value.c_contiguous:
+        return value.nbytes
+    if _is_ndarray(value) and not value.dtype.hasobject:
+        return value.nbytes
+    return 0
+
+
+@dataclass(frozen=True)
+class SharedResult:
+    """Picklable handle to a result placed in shared memory or a spill file"""
+
+    name: str
+    size: int
+    kind: str
+    backend: str
+    shape: Tuple[int, ...] = ()
+    dtype: str = ""
+
+    def attach(self) -> Tuple[Any, Any]:
+        """Map the payload and return a read-only view plus the mapping backing it"""
+        if self.backend == "shm":
+            if sys.version_info >= (3, 13):
+                mapping = shared_memory.SharedMemory(name=self.name, track=False)
+            else:
+                mapping = shared_memory.SharedMemory(name=self.name)
+            buffer = mapping.buf
+        else:
+            with open(self.name, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = memoryview(mapping)
+
+        if self.kind == "ndarray":
+            import numpy as np
+
+            view = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=buffer)
+            view.flags.writeable = False
+        else:
+            view = buffer[: self.size].toreadonly()
+
+        return view, mapping
+
+
+def _attach_all(dep_results: Dict[str, Any], mappings: List[Any]) -> Dict[str, Any]:
+    resolved = {}
+    for dep, value in dep_results.items():
+        if isinstance(value, SharedResult):
+            value, mapping = value.attach()
+            mappings.append(mapping)
+        resolved[dep] = value
+    return resolved
+
+
+def _detach(mapping: Any) -> None:
+    try:
+        mapping.close()
+    except BufferError:
+        # The task kept a reference to a view (e.g. returned it); the mapping
+        # is released once that reference is garbage collected
+        pass
+
+
+def call_with_shared_results(func: Callable, args: List, kwargs: Dict[str, Any]) -> Any:
+    """Resolve SharedResult handles in ``dep_results`` and call ``func`` (runs in the worker)"""
+    mappings: List[Any] = []
+    if kwargs.get("dep_results"):
+        kwargs = {**kwargs, "dep_results": _attach_all(kwargs["dep_results"], mappings)}
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Drop the views before unmapping so the buffers are no longer exported
+        kwargs = None
+        for mapping in mappings:
+            _detach(mapping)
+
+
+class SharedResultManager:
+    """Export large results once and free them when their last consumer finishes"""
+
+    def __init__(self, threshold: int, spill_dir: Optional[Union[str, Path]] = None):
+        self.threshold = threshold
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._handles: Dict[str, SharedResult] = {}
+        self._consumers: Dict[str, Set[str]] = {}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def share(self, task_id: str, value: Any, consumers: Iterable[str]) -> Any:
+        """Return a handle for ``value`` if it is large enough to share, else the value itself
+
+        ``consumers`` are the tasks that must :meth:`release` the result before
+        the payload is freed; they only apply when the result is first exported.
+        """
+        handle = self._handles.get(task_id)
+        if handle is not None:
+            return handle
+
+        consumers = set(consumers)
+        size = shareable_size(value)
+        if size < self.threshold or not consumers:
+            return value
+
+        kind = "ndarray" if _is_ndarray(value) else "bytes"
+        source = memoryview(value).cast("B") if kind == "bytes" else memoryview(value.reshape(-1).view("uint8"))
+
+        if self.spill_dir is None:
+            segment = shared_memory.SharedMemory(create=True, size=size)
+            segment.buf[:size] = source
+            self._segments[task_id] = segment
+            name, backend = segment.name, "shm"
+        else:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=self.spill_dir, prefix=f"{task_id}-", suffix=".spill")
+            with os.fdopen(fd, "wb") as f:
+                f.write(source)
+            backend = "mmap"
+
+        handle = SharedResult(
+            name=name,
+            size=size,
+            kind=kind,
+            backend=backend,
+            shape=tuple(value.shape) if kind == "ndarray" else (),
+            dtype=value.dtype.str if kind == "ndarray" else "",
+        )
+        self._handles[task_id] = handle
+        self._consumers[task_id] = consumers
+        return handle
+
+    def release(self, task_id: str, consumer: str) -> None:
+        """Record that a consumer of a shared result has finished or will not run"""
+        consumers = self._consumers.get(task_id)
+        if consumers is None:
+            return
+
+        consumers.discard(consumer)
+        if not consumers:
+            self._free(task_id)
+
+    def _free(self, task_id: str) -> None:
+        handle = self._handles.pop(task_id)
+        del self._consumers[task_id]
+        segment = self._segments.pop(task_id, None)
+        if segment is not None:
+            segment.close()
+            segment.unlink()
+        else:
+            try:
+                os.unlink(handle.name)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        """Free every outstanding shared result"""
+        for task_id in list(self._handles):
+            self._free(task_id)
@@ -0,0 +1,108 @@
+"""Coalesce task status updates into batched websocket frames."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class StatusBatcher:
+    """Buffer status updates and send them together
+
+    Updates are keyed by task, and a later update replaces an earlier one for
+    the same task that has not been sent yet, so a task that starts and
+    completes within one window costs a single entry. The buffer is handed to
+    ``send`` ``interval`` seconds after its first update, or as soon as it
+    holds ``max_batch`` tasks, in lists of at most ``max_batch`` updates.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        interval: float = 0.05,
+        max_batch: int = 100,
+    ):
+        if interval < 0 or max_batch < 1:
+            raise ValueError("interval must be >= 0 and max_batch >= 1")
+        self.send = send
+        self.interval = interval
+        self.max_batch = max_batch
+        self.logger = logging.getLogger("StatusBatcher")
+
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: set = set()
+        self._flush_scheduled = False
+        self._lock = asyncio.Lock()
+
+        self.updates = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.sent = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update(self, key: Hashable, update: Dict[str, Any]) -> None:
+        """Buffer the latest update for ``key``; needs a running event loop"""
+        self.updates += 1
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = update
+
+        if self._flush_scheduled:
+            return
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flush_scheduled = True
+        task = asyncio.ensure_future(self._flush_logged())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to send status batch: {e}")
+
+    async def flush(self) -> int:
+        """Send everything buffered now and return the number of updates sent"""
+        # The lock keeps batches in the order their updates were buffered
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                self._flush_scheduled = False
+                return 0
+            updates = list(self._pending.values())
+            self._pending = {}
+            self._flush_scheduled = False
+            for start in range(0, len(updates), self.max_batch):
+                batch = updates[start : start + self.max_batch]
+                await self.send(batch)
+                self.batches += 1
+                self.sent += len(batch)
+            return len(updates)
+
+    async def close(self) -> None:
+        """Send the remaining updates and wait for flushes already under way"""
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "sent": self.sent,
+            "pending": len(self._pending),
+            "updates_per_batch": self.sent / self.batches if self.batches else 0.0,
+        }
@@ -1,14 +1,227 @@
 """Task DAG implementation for managing task dependencies and execution flow."""
 
 import asyncio
-from typing import Dict, List, Optional, Set, Any, Callable
+import functools
+import heapq
+import inspect
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 import logging
 from datetime import datetime
-import networkx as nx
 from prometheus_client import Counter, Gauge, Histogram
 
+from .dag_checkpoint import DAGCheckpoint
+from .dag_graph import CompactGraph
+from .resources import ResourcePool
+from .task_metrics import (
+    DEFAULT_TIMING_BUFFER_SIZE,
+    MAX_TASK_KINDS,
+    KindLabeler,
+    TaskTiming,
+    TaskTimings,
+    task_kind,
+)
+from .task_trace import TraceRecorder, now
+from .shared_results import SharedResultManager, call_with_shared_results
+from .result_cache import (
+    MemoryResultStore,
+    ResultStore,
+    cache_key,
+    deserialize_result,
+    payload_digest,
+    result_digest,
+    serialize_result,
+)
+
+# Metrics are registered once per process and shared by every TaskDAG instance.
+# Durations are labelled by task kind, capped by TASK_KINDS; exact per-task
+# timings live in each DAG's TaskTimings buffer instead
+TASK_COUNTER = Counter("task_dag_tasks_total", "Total number of tasks", ["status"])
+ACTIVE_TASKS = Gauge("task_dag_active_tasks", "Number of currently active tasks")
+TASK_DURATION = Histogram("task_dag_task_duration_seconds", "Task duration in seconds", ["kind"])
+TASK_KINDS = KindLabeler()
+SPECULATIVE_ATTEMPTS = Counter(
+    "task_dag_speculative_attempts_total",
+    "Duplicate attempts started for straggling idempotent tasks",
+    ["outcome"],
+)
+
+# Observed durations kept per task for critical-path estimates, and per task
+# kind (for at most MAX_TASK_KINDS kinds) for speculation
+DURATION_HISTORY_SIZE = 50
+DEFAULT_TASK_DURATION = 1.0
+
+# Where synchronous task functions run: on the event loop, or in a managed pool
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+# What execute_dag does when a task fails after its retries:
+#   fail_fast    stop scheduling new tasks and raise once in-flight tasks settle
+#   continue     keep running branches independent of the failure, then raise
+#   best_effort  keep running independent branches and return without raising
+FAILURE_POLICIES = ("fail_fast", "continue", "best_effort")
+
+# Trace tracks that task attempts are drawn on, by executor kind
+TRACE_TRACKS = {"inline": "event loop", "thread": "thread pool", "process": "process pool"}
+
+# Results at least this large reach process tasks through shared memory
+DEFAULT_SHARED_RESULT_THRESHOLD = 1024 * 1024
+
+
+def _accepts_dep_results(func: Callable) -> bool:
+    """Check whether a task function can receive the ``dep_results`` keyword"""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(p.name == "dep_results" or p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+class TaskEvent(NamedTuple):
+    """A task state change yielded by :meth:`TaskDAG.stream`"""
+
+    event: str
+    task_id: str
+    timestamp: float
+    result: Any = None
+    error: Optional[str] = None
+    cached: bool = False
+
+    def to_message(self, sender: str) -> Dict[str, Any]:
+        """Build the websocket ``task_update`` message for this event
+
+        Serialize with ``json.dumps(..., default=str)`` if results may not be JSON-native.
+        """
+        return {
+            "sender": sender,
+            "message_type": "task_update",
+            "content": {
+                "task_id": self.task_id,
+                "status": self.event,
+                "timestamp": self.timestamp,
+                "result": self.result,
+                "error": self.error,
+                "cached": self.cached,
+            },
+        }
+
+
+# Queued after the last event of a streamed run
+_STREAM_END = object()
+
+
+class DAGExecutionError(RuntimeError):
+    """Raised when tasks fail; carries the results of every task that did complete"""
+
+    def __init__(self, message: str, results: Dict[str, Any], failed: Dict[str, str], skipped: List[str]):
+        super().__init__(message)
+        self.results = results
+        self.failed = failed
+        self.skipped = skipped
+
+
+# Every status a task can be in
+TASK_STATUSES = ("pending", "running", "completed", "failed", "skipped", "cancelled")
+
+# Per-node scheduling states of a run
+_WAITING, _LAUNCHED, _FINISHED = 0, 1, 2
+
+
+class _DAGRun:
+    """Scheduling state of an in-progress execute_dag call, indexed by node id"""
+
+    __slots__ = ("in_degree", "priorities", "state", "ready", "results", "wakeup", "ready_at")
+
+    def __init__(self, in_degree, priorities: List[float], traced: bool = False):
+        self.in_degree = in_degree
+        self.priorities = priorities
+        self.state = bytearray(len(in_degree))
+        self.ready: List[Tuple[float, int]] = []
+        self.results: Dict[str, Any] = {}
+        self.wakeup: Optional[asyncio.Future] = None
+        # When each queued node became ready, kept only while tracing
+        self.ready_at: Optional[Dict[int, int]] = {} if traced else None
+
+    def push(self, node: int) -> None:
+        heapq.heappush(self.ready, (-self.priorities[node], node))
+        if self.ready_at is not None:
+            self.ready_at.setdefault(node, now())
+
+    def wake(self) -> None:
+        if self.wakeup is not None and not self.wakeup.done():
+            self.wakeup.set_result(None)
+
+
+class _StatusIndex:
+    """Task counts per status plus the running and failed sets, updated on every transition"""
+
+    __slots__ = ("counts", "running", "failed")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = dict.fromkeys(TASK_STATUSES, 0)
+        self.running: Set[str] = set()
+        self.failed: Set[str] = set()
+
+    def add(self, task_id: str, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+        if status == "running":
+            self.running.add(task_id)
+        elif status == "failed":
+            self.failed.add(task_id)
+
+    def move(self, task_id: str, old: str, new: str) -> None:
+        self.counts[old] -= 1
+        if old == "running":
+            self.running.discard(task_id)
+        elif old == "failed":
+            self.failed.discard(task_id)
+        self.add(task_id, new)
+
 
 class Task:
+    __slots__ = (
+        "task_id",
+        "func",
+        "args",
+        "kwargs",
+        "dependencies",
+        "timeout",
+        "retries",
+        "retry_delay",
+        "_status",
+        "_status_index",
+        "result",
+        "error",
+        "start_time",
+        "end_time",
+        "retry_count",
+        "estimated_duration",
+        "memoize",
+        "cached",
+        "executor",
+        "idempotent",
+        "resources",
+        "kind",
+    )
+
     def __init__(
         self,
         task_id: str,
@@ -19,7 +232,18 @@ class Task:
         timeout: Optional[float] = None,
         retries: int = 0,
         retry_delay: float = 1.0,
+        estimated_duration: Optional[float] = None,
+        memoize: bool = False,
+        executor: str = "inline",
+        idempotent: bool = False,
+        resources: Optional[Dict[str, int]] = None,
+        kind: Optional[str] = None,
     ):
+        if executor not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {executor}")
+        if executor != "inline" and asyncio.iscoroutinefunction(func):
+            raise ValueError(f"Coroutine task {task_id} runs on the event loop and must use the inline executor")
+
         self.task_id = task_id
         self.func = func
         self.args = args or []
@@ -28,134 +252,1055 @@ class Task:
         self.timeout = timeout
         self.retries = retries
         self.retry_delay = retry_delay
-        self.status = "pending"
+        self._status_index: Optional[_StatusIndex] = None
+        self._status = "pending"
         self.result = None
         self.error = None
         self.start_time = None
         self.end_time = None
         self.retry_count = 0
+        self.estimated_duration = estimated_duration
+        self.memoize = memoize
+        self.cached = False
+        self.executor = executor
+        self.idempotent = idempotent
+        self.resources = {name: amount for name, amount in (resources or {}).items() if amount}
+        self.kind = kind or task_kind(func)
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, status: str) -> None:
+        # Keeps the owning DAG's status counters in step with the task
+        if self._status_index is not None and status != self._status:
+            self._status_index.move(self.task_id, self._status, status)
+        self._status = status
 
 
 class TaskDAG:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        result_store: Optional[ResultStore] = None,
+        max_workers: Optional[int] = None,
+        shared_result_threshold: int = DEFAULT_SHARED_RESULT_THRESHOLD,
+        spill_dir: Optional[Union[str, Path]] = None,
+        speculation_percentile: Optional[float] = 0.95,
+        speculation_min_samples: int = 5,
+        failure_policy: str = "fail_fast",
+        cancel_in_flight: bool = False,
+        resources: Optional[Union[Mapping[str, int], ResourcePool]] = None,
+        timing_buffer_size: int = DEFAULT_TIMING_BUFFER_SIZE,
+        kind_durations: Optional[Dict[str, Deque[float]]] = None,
+    ):
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy: {failure_policy}")
+
         self.logger = logging.getLogger("TaskDAG")
-        self.graph = nx.DiGraph()
+        self.graph = CompactGraph()
         self.tasks: Dict[str, Task] = {}
+        self.max_concurrency = max_concurrency
+        self.failure_policy = failure_policy
+        self.cancel_in_flight = cancel_in_flight
+        self.duration_history: Dict[str, Deque[float]] = {}
+
+        # Token pools for tasks that declare resource requirements; pass a
+        # ResourcePool to share limits with other DAGs or a TaskExecutor
+        if resources is not None and not isinstance(resources, ResourcePool):
+            resources = ResourcePool(resources)
+        self.resource_pool = resources
+
+        # Idempotent tasks running past this percentile of the durations of
+        # their kind get a duplicate attempt; None disables speculation. Peers
+        # of one kind share a history, which can be passed in to share it
+        # between DAGs
+        self.speculation_percentile = speculation_percentile
+        self.speculation_min_samples = speculation_min_samples
+        self.kind_durations = kind_durations if kind_durations is not None else {}
+
+        # Memoized results of tasks created with memoize=True
+        self.result_store = result_store if result_store is not None else MemoryResultStore()
+        self._result_digests: Dict[str, str] = {}
+
+        # Pools for tasks declared with executor="thread" or "process", created on first use
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executors: Dict[str, Executor] = {}
+
+        # Large results handed to process tasks; spilled to memory-mapped files
+        # under spill_dir instead of shared memory when it is set
+        self._shared_results = SharedResultManager(shared_result_threshold, spill_dir)
+
+        # Queues of active stream() consumers
+        self._subscribers: List[asyncio.Queue] = []
+
+        # Scheduling state while execute_dag is running
+        self._run: Optional[_DAGRun] = None
+
+        # Span recorder of the current run when it is traced
+        self._tracer: Optional[TraceRecorder] = None
+
+        # Tasks invalidated since their last run, recomputed by rerun_dirty()
+        self.dirty: Set[str] = set()
+
+        # Status counts maintained as tasks transition, so polling is O(1)
+        self._status_index = _StatusIndex()
+
+        # get_critical_path() result, until the graph changes or, outside a run,
+        # a duration estimate changes; durations observed during a run take
+        # effect when it ends, so polling status mid-run never walks the graph
+        self._critical_path: Optional[Tuple[List[str], float]] = None
 
         # Metrics
-        self.task_counter = Counter("task_dag_tasks_total", "Total number of tasks", ["status"])
-        self.active_tasks = Gauge("task_dag_active_tasks", "Number of currently active tasks")
-        self.task_duration = Histogram("task_dag_task_duration_seconds", "Task duration in seconds", ["task_id"])
+        self.task_counter = TASK_COUNTER
+        self.active_tasks = ACTIVE_TASKS
+        self.task_duration = TASK_DURATION
+        self.speculative_attempts = SPECULATIVE_ATTEMPTS
+
+        # Most recent per-task timings, for queries and export
+        self.timings = TaskTimings(timing_buffer_size)
 
     def add_task(self, task: Task) -> None:
-        """Add a task to the DAG"""
+        """Add a task to the DAG
+
+        Only the edges introduced by the new task are checked for cycles, so
+        building a DAG one task at a time stays linear in its size. Tasks may be
+        added while the DAG is executing (e.g. by a running task fanning out);
+        they are scheduled as soon as their dependencies have completed. Add
+        them from the event loop's thread, i.e. from inline or coroutine tasks.
+        """
         if task.task_id in self.tasks:
             raise ValueError(f"Task {task.task_id} already exists")
 
-        self.tasks[task.task_id] = task
-        self.graph.add_node(task.task_id)
-
         for dep in task.dependencies:
+            if dep == task.task_id:
+                raise ValueError(f"Adding this task would create a cycle: {dep} -> {dep}")
             if dep not in self.tasks:
                 raise ValueError(f"Dependency {dep} not found")
-            self.graph.add_edge(dep, task.task_id)
+
+        self._validate_resources(task)
 
         # Verify no cycles
-        if not nx.is_directed_acyclic_graph(self.graph):
-            self.graph.remove_node(task.task_id)
-            del self.tasks[task.task_id]
-            raise ValueError("Adding this task would create a cycle")
+        cycle = self._find_cycle_through(task.task_id, task.dependencies)
+        if cycle:
+            raise ValueError(f"Adding this task would create a cycle: {' -> '.join(cycle)}")
+
+        self.tasks[task.task_id] = task
+        self._track_status(task)
+        self.graph.add_node(task.task_id)
+        for dep in task.dependencies:
+            self.graph.add_edge(dep, task.task_id)
 
         self.task_counter.labels(status="pending").inc()
+        if self._run is not None:
+            self._schedule_added([task.task_id])
+
+    def add_tasks(self, tasks: Iterable[Task]) -> None:
+        """Add several tasks to the DAG, validating the whole batch once
+
+        Tasks may depend on each other in any order within the batch. The batch
+        is inserted atomically: if any task is a duplicate, references a missing
+        dependency or closes a cycle, nothing is added.
+        """
+        batch: Dict[str, Task] = {}
+        for task in tasks:
+            if task.task_id in self.tasks or task.task_id in batch:
+                raise ValueError(f"Task {task.task_id} already exists")
+            self._validate_resources(task)
+            batch[task.task_id] = task
+
+        # Existing tasks are already acyclic and never depend on the batch, so a
+        # cycle can only run through dependencies inside the batch
+        pending_deps: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in batch}
+        for task_id, task in batch.items():
+            pending_deps[task_id] = 0
+            for dep in task.dependencies:
+                if dep in batch:
+                    pending_deps[task_id] += 1
+                    dependents[dep].append(task_id)
+                elif dep not in self.tasks:
+                    raise ValueError(f"Dependency {dep} not found")
+
+        order = [task_id for task_id, count in pending_deps.items() if count == 0]
+        for task_id in order:
+            for child in dependents[task_id]:
+                pending_deps[child] -= 1
+                if pending_deps[child] == 0:
+                    order.append(child)
+
+        if len(order) != len(batch):
+            cycle = self._find_cycle_in_batch(batch, {task_id for task_id, count in pending_deps.items() if count})
+            raise ValueError(f"Adding these tasks would create a cycle: {' -> '.join(cycle)}")
+
+        for task_id in order:
+            task = batch[task_id]
+            self.tasks[task_id] = task
+            self._track_status(task)
+            self.graph.add_node(task_id)
+            for dep in task.dependencies:
+                self.graph.add_edge(dep, task_id)
+
+        self.task_counter.labels(status="pending").inc(len(order))
+        if self._run is not None:
+            self._schedule_added(order)
+
+    def add_dependency(self, task_id: str, dependency: str) -> None:
+        """Make an existing task wait for another task
+
+        The task must not have started yet. This lets a running task attach the
+        children it just added to a downstream reducer.
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            raise ValueError(f"Task {task_id} not found")
+        if dependency not in self.tasks:
+            raise ValueError(f"Dependency {dependency} not found")
+        if dependency in task.dependencies:
+            return
+        if task.status != "pending" or (
+            self._run is not None and self._run.state[self.graph.index(task_id)] != _WAITING
+        ):
+            raise ValueError(f"Task {task_id} has already started")
+        if dependency == task_id:
+            raise ValueError(f"Adding this dependency would create a cycle: {task_id} -> {task_id}")
+
+        cycle = self._find_cycle_through(task_id, [dependency])
+        if cycle:
+            raise ValueError(f"Adding this dependency would create a cycle: {' -> '.join(cycle)}")
+
+        task.dependencies.add(dependency)
+        self.graph.add_edge(dependency, task_id)
+        self._critical_path = None
+
+        run = self._run
+        if run is None:
+            return
+        node = self.graph.index(task_id)
+        if self.tasks[dependency].status in ("failed", "skipped", "cancelled"):
+            # Same as tasks added under a dependency that did not complete
+            run.state[node] = _FINISHED
+            self._mark_skipped(task)
+            self._skip_descendants(node)
+        elif run.state[self.graph.index(dependency)] != _FINISHED:
+            # A queued entry for the task goes stale and is skipped when popped
+            run.in_degree[node] += 1
+
+    def _track_status(self, task: Task) -> None:
+        task._status_index = self._status_index
+        self._status_index.add(task.task_id, task.status)
+        self._critical_path = None
+
+    def _validate_resources(self, task: Task) -> None:
+        if not task.resources:
+            return
+        if self.resource_pool is None:
+            raise ValueError(f"Task {task.task_id} requires resources but the DAG has no resource limits")
+        try:
+            self.resource_pool.validate(task.resources)
+        except ValueError as e:
+            raise ValueError(f"Task {task.task_id}: {str(e)}") from None
+
+    def _schedule_added(self, task_ids: List[str]) -> None:
+        """Register tasks added during execution with the running scheduler"""
+        run = self._run
+        graph = self.graph
+        for task_id in task_ids:
+            task = self.tasks[task_id]
+            unfinished = sum(1 for dep in task.dependencies if run.state[graph.index(dep)] != _FINISHED)
+            run.in_degree.append(unfinished)
+            run.priorities.append(self.estimate_duration(task))
+            if any(self.tasks[dep].status in ("failed", "skipped", "cancelled") for dep in task.dependencies):
+                run.state.append(_FINISHED)
+                self._mark_skipped(task)
+                continue
+            run.state.append(_WAITING)
+            if not unfinished:
+                run.push(graph.index(task_id))
+        run.wake()
+
+    def _find_cycle_through(self, task_id: str, dependencies: Iterable[str]) -> Optional[List[str]]:
+        """Return the cycle that edges ``dep -> task_id`` would close, if any
+
+        A cycle exists only when one of the dependencies is reachable from
+        ``task_id``, so the search is limited to the descendants of ``task_id``.
+        """
+        targets = {self.graph.index(dep) for dep in dependencies if dep in self.graph}
+        if not targets or task_id not in self.graph or not self.graph.out_degree(task_id):
+            return None
+
+        start = self.graph.index(task_id)
+        parents: Dict[int, int] = {start: -1}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node in targets:
+                path = [node]
+                while parents[path[-1]] != -1:
+                    path.append(parents[path[-1]])
+                path.reverse()
+                return [self.graph.name(n) for n in path] + [task_id]
+            for child in self.graph.successor_ids(node):
+                if child not in parents:
+                    parents[child] = node
+                    stack.append(child)
+
+        return None
+
+    @staticmethod
+    def _find_cycle_in_batch(batch: Dict[str, Task], blocked: Set[str]) -> List[str]:
+        """Walk dependencies among tasks left unsorted until a task repeats"""
+        node = next(task_id for task_id in batch if task_id in blocked)
+        seen: Dict[str, int] = {}
+        path: List[str] = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = min(dep for dep in batch[node].dependencies if dep in blocked)
+
+        # Dependencies point backwards, so reverse to read in execution order
+        cycle = path[seen[node] :] + [node]
+        cycle.reverse()
+        return cycle
 
     async def execute_task(self, task: Task) -> Any:
-        """Execute a single task with retries and timeout"""
+        """Execute a single task with retries and timeout
+
+        Memoized tasks whose function, arguments and upstream results match a
+        stored entry are completed from the result store without running.
+        """
+        self._result_digests.pop(task.task_id, None)
+        task.cached = False
+        task.retry_count = 0
+        task.error = None
+
+        memo_key = self._memo_key(task) if task.memoize else None
+        if memo_key is not None:
+            payload = self.result_store.get(memo_key)
+            if payload is not None:
+                task.start_time = task.end_time = datetime.now()
+                task.result = deserialize_result(payload)
+                task.status = "completed"
+                task.cached = True
+                self._result_digests[task.task_id] = payload_digest(payload)
+                self.task_counter.labels(status="cached").inc()
+                self._record_timing(task, 0.0)
+                if self._tracer is not None:
+                    self._tracer.instant(TRACE_TRACKS[task.executor], task.task_id, "cached", now())
+                self._emit(task, "completed", result=task.result, cached=True)
+                return task.result
+
         task.start_time = datetime.now()
         task.status = "running"
         self.task_counter.labels(status="running").inc()
         self.active_tasks.inc()
+        self._emit(task, "started")
 
+        tracer = self._tracer
         try:
             while task.retry_count <= task.retries:
+                attempt_start = now() if tracer is not None else 0
                 try:
                     if task.timeout:
-                        result = await asyncio.wait_for(self._run_task(task), timeout=task.timeout)
+                        result = await asyncio.wait_for(self._run_attempt(task), timeout=task.timeout)
                     else:
-                        result = await self._run_task(task)
+                        result = await self._run_attempt(task)
 
                     task.result = result
                     task.status = "completed"
                     task.end_time = datetime.now()
+                    if tracer is not None:
+                        self._trace_attempt(tracer, task, attempt_start)
 
                     duration = (task.end_time - task.start_time).total_seconds()
-                    self.task_duration.labels(task_id=task.task_id).observe(duration)
+                    self.task_duration.labels(kind=TASK_KINDS.label(task.kind)).observe(duration)
+                    self.record_duration(task.task_id, duration)
+                    self.record_kind_duration(task.kind, duration)
+                    self._record_timing(task, duration)
+
+                    if memo_key is not None:
+                        self._memoize_result(task, memo_key)
 
                     self.task_counter.labels(status="completed").inc()
+                    self._emit(task, "completed", result=result)
                     return result
 
                 except Exception as e:
                     task.error = str(e)
+                    if tracer is not None:
+                        self._trace_attempt(tracer, task, attempt_start, error=task.error)
                     task.retry_count += 1
 
                     if task.retry_count <= task.retries:
+                        retry_start = now() if tracer is not None else 0
                         await asyncio.sleep(task.retry_delay)
+                        if tracer is not None:
+                            args = {"attempt": task.retry_count + 1}
+                            tracer.span("retry wait", task.task_id, "retry", retry_start, now(), args)
                     else:
                         task.status = "failed"
                         task.end_time = datetime.now()
                         self.task_counter.labels(status="failed").inc()
+                        self._record_timing(task, (task.end_time - task.start_time).total_seconds())
+                        self._emit(task, "failed", error=task.error)
                         raise
 
         finally:
             self.active_tasks.dec()
 
+    @staticmethod
+    def _trace_attempt(tracer: TraceRecorder, task: Task, start: int, error: Optional[str] = None) -> None:
+        args = {"attempt": task.retry_count + 1, "kind": task.kind}
+        if error is not None:
+            args["error"] = error
+        tracer.span(TRACE_TRACKS[task.executor], task.task_id, "run", start, now(), args)
+
+    def _record_timing(self, task: Task, duration: float) -> None:
+        self.timings.record(
+            TaskTiming(
+                task.task_id,
+                task.kind,
+                task.status,
+                task.start_time.timestamp(),
+                duration,
+                task.retry_count,
+                task.cached,
+            )
+        )
+
+    def _emit(self, task: Task, event: str, result: Any = None, error: Optional[str] = None, cached: bool = False):
+        if self._subscribers:
+            task_event = TaskEvent(event, task.task_id, time.time(), result, error, cached)
+            for queue in self._subscribers:
+                queue.put_nowait(task_event)
+
+    async def stream(self, **execute_kwargs) -> AsyncIterator[TaskEvent]:
+        """Execute the DAG, yielding task state changes as they happen
+
+        Events are ``started``, ``completed``, ``failed``, ``skipped`` and
+        ``cancelled``. Keyword arguments are passed to :meth:`execute_dag`. If the run fails,
+        the error is raised after the events that led to it have been yielded.
+        Closing the iterator early cancels the run.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        run = asyncio.ensure_future(self.execute_dag(**execute_kwargs))
+        run.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is _STREAM_END:
+                    break
+                yield event
+
+            await run
+
+        finally:
+            self._subscribers.remove(queue)
+            if not run.done():
+                run.cancel()
+
+    def _memo_key(self, task: Task) -> Optional[str]:
+        """Hash the task's function, arguments and upstream results"""
+        try:
+            kwargs = {key: value for key, value in task.kwargs.items() if key != "dep_results"}
+            dep_digests = {dep: self._result_digest(dep) for dep in task.dependencies}
+            return cache_key(task.func, task.args, kwargs, dep_digests)
+        except Exception as e:
+            self.logger.warning(f"Task {task.task_id} cannot be memoized: {str(e)}")
+            return None
+
+    def _result_digest(self, task_id: str) -> str:
+        digest = self._result_digests.get(task_id)
+        if digest is None:
+            digest = self._result_digests[task_id] = result_digest(self.tasks[task_id].result)
+        return digest
+
+    def _memoize_result(self, task: Task, memo_key: str) -> None:
+        try:
+            payload = serialize_result(task.result)
+        except Exception as e:
+            self.logger.warning(f"Result of task {task.task_id} cannot be memoized: {str(e)}")
+            return
+
+        self.result_store.put(memo_key, payload)
+        self._result_digests[task.task_id] = payload_digest(payload)
+
+    async def _run_attempt(self, task: Task) -> Any:
+        """Run one attempt of a task, speculatively duplicating idempotent stragglers
+
+        Once an idempotent task outlives the configured percentile of the observed
+        durations of its kind a second copy is started; the first successful result wins and
+        the other copy is cancelled. The attempt only fails if both copies fail.
+        """
+        delay = self._speculation_delay(task)
+        if delay is None:
+            return await self._run_task(task)
+
+        primary = asyncio.ensure_future(self._run_task(task))
+        attempts = {primary}
+        speculated = False
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                attempts.add(asyncio.ensure_future(self._run_task(task)))
+                speculated = True
+                self.speculative_attempts.labels(outcome="launched").inc()
+                self.logger.info(f"Task {task.task_id} exceeded {delay:.3f}s; started a speculative attempt")
+
+            error = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if speculated:
+                            outcome = "lost" if future is primary else "won"
+                            self.speculative_attempts.labels(outcome=outcome).inc()
+                        return future.result()
+                    error = error or future.exception()
+            raise error
+
+        finally:
+            for future in attempts:
+                future.cancel()
+
+    def _speculation_delay(self, task: Task) -> Optional[float]:
+        """How long to wait before duplicating an idempotent task, if it may be duplicated"""
+        if not task.idempotent or self.speculation_percentile is None:
+            return None
+
+        history = self.kind_durations.get(task.kind)
+        if not history or len(history) < self.speculation_min_samples:
+            return None
+
+        ordered = sorted(history)
+        rank = max(1, math.ceil(self.speculation_percentile * len(ordered)))
+        return ordered[rank - 1]
+
     async def _run_task(self, task: Task) -> Any:
-        """Internal method to run a task"""
+        """Internal method to run a task
+
+        Synchronous functions run on the event loop (``inline``) or in the DAG's
+        thread or process pool. A pooled call that times out is abandoned rather
+        than interrupted, so its worker stays busy until the function returns.
+        """
         if asyncio.iscoroutinefunction(task.func):
             return await task.func(*task.args, **task.kwargs)
-        else:
+        elif task.executor == "inline":
             return task.func(*task.args, **task.kwargs)
+        else:
+            if task.executor == "process":
+                call = functools.partial(call_with_shared_results, task.func, task.args, task.kwargs)
+            else:
+                call = functools.partial(task.func, *task.args, **task.kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(task.executor), call)
+
+    def _get_executor(self, kind: str) -> Executor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            if kind == "thread":
+                executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="TaskDAG")
+            else:
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._executors[kind] = executor
+        return executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread and process pools used by pooled tasks"""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+        self._executors.clear()
+
+    async def execute_dag(
+        self,
+        max_concurrency: Optional[int] = None,
+        checkpoint: Optional[Union[str, Path, DAGCheckpoint]] = None,
+        resume_from: Optional[Union[str, Path, DAGCheckpoint]] = None,
+        failure_policy: Optional[str] = None,
+        cancel_in_flight: Optional[bool] = None,
+        trace: Optional[Union[str, Path, TraceRecorder]] = None,
+    ) -> Dict[str, Any]:
+        """Execute the entire DAG
+
+        Tasks are launched as soon as all of their dependencies have completed, so
+        independent branches run concurrently. At most ``max_concurrency`` tasks run
+        at once (falls back to the value given to the constructor; ``None`` means
+        unbounded, ``1`` gives strictly sequential execution). When more tasks are
+        ready than may start, the ones with the longest remaining path to the end
+        of the DAG go first. A task that declares ``resources`` additionally waits
+        until the DAG's resource pool can supply all of them; while it waits,
+        lower-priority tasks that need other resources may start ahead of it.
+
+        With ``checkpoint``, every task is written to that SQLite checkpoint as
+        it completes. ``resume_from`` reloads the completed tasks of an earlier
+        checkpoint and only runs the rest; new completions are appended to the
+        same checkpoint unless ``checkpoint`` names another one.
+
+        When a task fails, its descendants are marked ``skipped`` without being
+        scheduled and ``failure_policy`` decides what happens to the rest (see
+        ``FAILURE_POLICIES``). Under ``fail_fast``, ``cancel_in_flight`` also
+        cancels tasks that are already running. ``fail_fast`` and ``continue``
+        raise :class:`DAGExecutionError` holding the results of every completed
+        task; ``best_effort`` returns them with the ``failed`` and ``skipped`` tasks.
+
+        ``trace`` records when each task was queued, ran and waited to retry; a
+        path gets a Chrome trace-event JSON file of the run (open it in Perfetto),
+        a :class:`TraceRecorder` collects the spans for the caller to export.
+        """
+        limit = max_concurrency if max_concurrency is not None else self.max_concurrency
+        if limit is not None and limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        policy = self._resolve_failure_policy(failure_policy, cancel_in_flight)
+        tracer = self._open_trace(trace)
+
+        owned = []
+        if resume_from is not None and not isinstance(resume_from, DAGCheckpoint):
+            resume_from = DAGCheckpoint(resume_from)
+            owned.append(resume_from)
+        if checkpoint is None:
+            checkpoint = resume_from
+        elif not isinstance(checkpoint, DAGCheckpoint):
+            checkpoint = DAGCheckpoint(checkpoint)
+            owned.append(checkpoint)
 
-    async def execute_dag(self) -> Dict[str, Any]:
-        """Execute the entire DAG"""
         try:
-            start_time = datetime.now()
-            results = {}
+            restored = self._restore_checkpoint(resume_from) if resume_from is not None else set()
+            return await self._execute(limit, restored, checkpoint, *policy, tracer)
+        finally:
+            for store in owned:
+                store.close()
+            if tracer is not trace:
+                tracer.export(trace)
 
-            # Get execution order
-            try:
-                execution_order = list(nx.topological_sort(self.graph))
-            except nx.NetworkXUnfeasible:
-                raise ValueError("DAG contains cycles")
+    @staticmethod
+    def _open_trace(trace: Optional[Union[str, Path, TraceRecorder]]) -> Optional[TraceRecorder]:
+        if trace is None or isinstance(trace, TraceRecorder):
+            return trace
+        return TraceRecorder()
 
-            # Execute tasks in order
-            for task_id in execution_order:
-                task = self.tasks[task_id]
+    def _resolve_failure_policy(
+        self, failure_policy: Optional[str], cancel_in_flight: Optional[bool]
+    ) -> Tuple[str, bool]:
+        policy = failure_policy if failure_policy is not None else self.failure_policy
+        if policy not in FAILURE_POLICIES:
+            raise ValueError(f"Unknown failure policy: {policy}")
+        return policy, self.cancel_in_flight if cancel_in_flight is None else cancel_in_flight
 
-                # Wait for dependencies
-                for dep in task.dependencies:
-                    dep_task = self.tasks[dep]
-                    if dep_task.status != "completed":
-                        raise RuntimeError(f"Dependency {dep} failed or not completed")
+    def invalidate(self, task_id: str) -> Set[str]:
+        """Mark a task and all of its descendants dirty and return them
+
+        Dirty tasks are reset to ``pending`` and lose their results; every other
+        task keeps its status and result for :meth:`rerun_dirty`.
+        """
+        if task_id not in self.tasks:
+            raise ValueError(f"Task {task_id} not found")
+        if self._run is not None:
+            raise RuntimeError("Cannot invalidate tasks while the DAG is executing")
+
+        graph = self.graph
+        start = graph.index(task_id)
+        seen = {start}
+        stack = [start]
+        while stack:
+            for child in graph.successor_ids(stack.pop()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+
+        invalidated = {graph.name(node) for node in seen}
+        for name in invalidated:
+            task = self.tasks[name]
+            task.status = "pending"
+            task.result = None
+            task.error = None
+            task.start_time = task.end_time = None
+            task.retry_count = 0
+            task.cached = False
+            self._result_digests.pop(name, None)
+
+        self.dirty |= invalidated
+        return invalidated
+
+    async def rerun_dirty(
+        self,
+        max_concurrency: Optional[int] = None,
+        checkpoint: Optional[Union[str, Path, DAGCheckpoint]] = None,
+        failure_policy: Optional[str] = None,
+        cancel_in_flight: Optional[bool] = None,
+        trace: Optional[Union[str, Path, TraceRecorder]] = None,
+    ) -> Dict[str, Any]:
+        """Re-execute only the tasks marked dirty by :meth:`invalidate`
+
+        Clean tasks are not run again. Completed ones feed their existing results
+        to the dirty tasks and are included in the returned results; dirty tasks
+        downstream of a clean task that did not complete are skipped. Tasks that
+        do not complete stay dirty.
+        """
+        limit = max_concurrency if max_concurrency is not None else self.max_concurrency
+        policy = self._resolve_failure_policy(failure_policy, cancel_in_flight)
+        clean = [task_id for task_id in self.tasks if task_id not in self.dirty]
+        completed = {task_id for task_id in clean if self.tasks[task_id].status == "completed"}
+        incomplete = {task_id for task_id in clean if task_id not in completed}
+
+        tracer = self._open_trace(trace)
+        owned = checkpoint is not None and not isinstance(checkpoint, DAGCheckpoint)
+        if owned:
+            checkpoint = DAGCheckpoint(checkpoint)
+        try:
+            result = await self._execute(limit, completed, checkpoint, *policy, tracer, incomplete)
+        finally:
+            if owned:
+                checkpoint.close()
+            if tracer is not trace:
+                tracer.export(trace)
+            self.dirty = {task_id for task_id in self.dirty if self.tasks[task_id].status != "completed"}
+
+        return result
+
+    def _restore_checkpoint(self, checkpoint: DAGCheckpoint) -> Set[str]:
+        """Mark checkpointed tasks completed and return their ids"""
+        restored = set()
+        for task_id, state in checkpoint.load().items():
+            task = self.tasks.get(task_id)
+            if task is None or state["status"] != "completed":
+                continue
+
+            task.status = "completed"
+            task.result = state["result"]
+            task.start_time = state["start_time"]
+            task.end_time = state["end_time"]
+            task.retry_count = state["retry_count"]
+            task.error = None
+            restored.add(task_id)
+
+        if restored:
+            self.logger.info(f"Resumed {len(restored)} completed tasks from {checkpoint.path}")
+        return restored
+
+    async def _execute(
+        self,
+        limit: Optional[int],
+        completed: Set[str],
+        checkpoint: Optional[DAGCheckpoint],
+        failure_policy: str = "fail_fast",
+        cancel_in_flight: bool = False,
+        tracer: Optional[TraceRecorder] = None,
+        incomplete: Iterable[str] = (),
+    ) -> Dict[str, Any]:
+        """Run every task not in ``completed`` or ``incomplete``
+
+        Completed tasks are treated as done. Tasks in ``incomplete`` are left as
+        they are and the tasks that depend on them are skipped.
+        """
+        if self._run is not None:
+            raise RuntimeError("DAG is already executing")
+
+        start_time = datetime.now()
+        graph = self.graph
+        graph.compact()
+        run = self._run = _DAGRun(graph.in_degrees(), self._remaining_path_lengths(), tracer is not None)
+        self._tracer = tracer
+        results = run.results
+
+        for task_id in completed:
+            node = graph.index(task_id)
+            run.state[node] = _FINISHED
+            results[task_id] = self.tasks[task_id].result
+            for child in graph.successor_ids(node):
+                run.in_degree[child] -= 1
+        incomplete = [graph.index(task_id) for task_id in incomplete]
+        for node in incomplete:
+            run.state[node] = _FINISHED
+        for node in incomplete:
+            self._skip_descendants(node)
+
+        for node in range(len(graph)):
+            if run.in_degree[node] == 0 and run.state[node] == _WAITING:
+                run.push(node)
+
+        running: Dict[asyncio.Future, int] = {}
+        pool = self.resource_pool
+        shared_inputs: Dict[int, List[str]] = {}
+        failed: Dict[str, BaseException] = {}
+        stopped = False
+
+        try:
+            while run.ready or running:
+                # Launch every ready task the concurrency limit allows; under
+                # fail_fast, stop scheduling new work once a task has failed
+                blocked: List[Tuple[float, int]] = []
+                while run.ready and not stopped and (limit is None or len(running) < limit):
+                    entry = heapq.heappop(run.ready)
+                    node = entry[1]
+                    # Entries go stale when a dependency is added to a queued task
+                    if run.state[node] != _WAITING or run.in_degree[node]:
+                        continue
+
+                    task = self.tasks[graph.name(node)]
+                    # Tasks whose resources are exhausted wait without holding a
+                    # concurrency slot, so tasks needing other resources can start
+                    if task.resources and not pool.try_acquire(task.resources):
+                        blocked.append(entry)
+                        continue
+
+                    run.state[node] = _LAUNCHED
+                    if tracer is not None:
+                        launched = now()
+                        tracer.span("queue", task.task_id, "queue", run.ready_at.pop(node, launched), launched)
 
                     # Pass dependency results to task
-                    task.kwargs["dep_results"] = {dep: dep_task.result for dep in task.dependencies}
+                    if task.dependencies and _accepts_dep_results(task.func):
+                        if task.executor == "process":
+                            task.kwargs["dep_results"] = self._share_dep_results(task)
+                            shared_inputs[node] = list(task.dependencies)
+                        else:
+                            task.kwargs["dep_results"] = {dep: self.tasks[dep].result for dep in task.dependencies}
 
-                results[task_id] = await self.execute_task(task)
+                    running[asyncio.ensure_future(self.execute_task(task))] = node
 
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+                for entry in blocked:
+                    heapq.heappush(run.ready, entry)
 
-            return {
-                "results": results,
-                "duration": duration,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-            }
+                if not running and (stopped or not blocked):
+                    break
 
-        except Exception as e:
-            self.logger.error(f"DAG execution failed: {str(e)}")
+                # Also wake up when a running task adds new ready work, or when
+                # another user of a shared resource pool frees tokens
+                run.wakeup = asyncio.get_running_loop().create_future()
+                waiters = [*running, run.wakeup]
+                if blocked:
+                    waiters.append(pool.released())
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future not in running:
+                        continue
+
+                    node = running.pop(future)
+                    run.state[node] = _FINISHED
+                    self._release_resources(node)
+                    for dep in shared_inputs.pop(node, ()):
+                        self._shared_results.release(dep, graph.name(node))
+
+                    if future.cancelled():
+                        task = self.tasks[graph.name(node)]
+                        if task.status == "cancelled":
+                            continue
+                        # The task's own coroutine raised CancelledError
+                        error = asyncio.CancelledError(f"Task {task.task_id} was cancelled")
+                        self._mark_failed(task, str(error))
+                    else:
+                        error = future.exception()
+
+                    if error is not None:
+                        failed[graph.name(node)] = error
+                        self._skip_descendants(node)
+                        if failure_policy == "fail_fast" and not stopped:
+                            stopped = True
+                            if cancel_in_flight:
+                                self._cancel_running(running)
+                        continue
+
+                    task_id = graph.name(node)
+                    results[task_id] = future.result()
+                    if checkpoint is not None:
+                        self._save_checkpoint(checkpoint, self.tasks[task_id])
+
+                    for child in graph.successor_ids(node):
+                        run.in_degree[child] -= 1
+                        if run.in_degree[child] == 0:
+                            run.push(child)
+
+        except BaseException:
+            # The run itself was cancelled (e.g. stream() closed early); tasks
+            # still in flight end up cancelled rather than stuck in running
+            self._cancel_running(running)
+            for node in running.values():
+                self._release_resources(node)
             raise
 
+        finally:
+            self._run = None
+            self._critical_path = None
+            self._tracer = None
+            self._shared_results.close()
+
+        skipped = []
+        if stopped:
+            # fail_fast leaves tasks that were never scheduled behind
+            for node in range(len(run.state)):
+                if run.state[node] == _WAITING:
+                    run.state[node] = _FINISHED
+                    self._mark_skipped(self.tasks[graph.name(node)])
+        for task_id, task in self.tasks.items():
+            if task.status in ("skipped", "cancelled"):
+                skipped.append(task_id)
+
+        if failed:
+            errors = {task_id: str(error) for task_id, error in failed.items()}
+            first_id, first_error = next(iter(failed.items()))
+            if len(failed) == 1:
+                message = f"Task {first_id} failed: {str(first_error)}"
+            else:
+                message = f"{len(failed)} tasks failed: {', '.join(failed)}"
+            self.logger.error(f"DAG execution failed: {message}; {len(skipped)} tasks skipped")
+            if failure_policy != "best_effort":
+                raise DAGExecutionError(message, results, errors, skipped) from first_error
+        elif _WAITING in run.state:
+            raise ValueError("DAG contains cycles")
+
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+
+        return {
+            "results": results,
+            "failed": {task_id: str(error) for task_id, error in failed.items()},
+            "skipped": skipped,
+            "duration": duration,
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+        }
+
+    def _release_resources(self, node: int) -> None:
+        task = self.tasks[self.graph.name(node)]
+        if task.resources:
+            self.resource_pool.release(task.resources)
+
+    def _skip_descendants(self, node: int) -> None:
+        """Mark every not-yet-scheduled descendant of a failed task as skipped"""
+        run = self._run
+        graph = self.graph
+        stack = [node]
+        while stack:
+            for child in graph.successor_ids(stack.pop()):
+                if run.state[child] == _WAITING:
+                    run.state[child] = _FINISHED
+                    self._mark_skipped(self.tasks[graph.name(child)])
+                    stack.append(child)
+
+    def _mark_skipped(self, task: Task) -> None:
+        task.status = "skipped"
+        task.result = None
+        for dep in task.dependencies:
+            self._shared_results.release(dep, task.task_id)
+        self.task_counter.labels(status="skipped").inc()
+        self._emit(task, "skipped")
+
+    def _mark_failed(self, task: Task, error: str) -> None:
+        task.status = "failed"
+        task.error = error
+        task.end_time = datetime.now()
+        self.task_counter.labels(status="failed").inc()
+        self._record_timing(task, (task.end_time - task.start_time).total_seconds())
+        self._emit(task, "failed", error=error)
+
+    def _cancel_running(self, running: Dict[asyncio.Future, int]) -> None:
+        """Cancel in-flight tasks after a fail-fast failure or when the run is cancelled"""
+        for future, node in running.items():
+            task = self.tasks[self.graph.name(node)]
+            if future.cancel():
+                task.status = "cancelled"
+                task.end_time = datetime.now()
+                self.task_counter.labels(status="cancelled").inc()
+                self._emit(task, "cancelled")
+
+    def _share_dep_results(self, task: Task) -> Dict[str, Any]:
+        """Build dep_results for a process task, replacing large results with shared handles"""
+        run = self._run
+        graph = self.graph
+        dep_results = {}
+        for dep in task.dependencies:
+            # Only consumers still to run release the result; finished or
+            # skipped ones never will, and would pin it until the run ends
+            consumers = [
+                graph.name(child)
+                for child in graph.successor_ids(graph.index(dep))
+                if run.state[child] != _FINISHED and self._receives_shared_results(self.tasks[graph.name(child)])
+            ]
+            dep_results[dep] = self._shared_results.share(dep, self.tasks[dep].result, consumers)
+        return dep_results
+
+    @staticmethod
+    def _receives_shared_results(task: Task) -> bool:
+        return task.executor == "process" and _accepts_dep_results(task.func)
+
+    def _save_checkpoint(self, checkpoint: DAGCheckpoint, task: Task) -> None:
+        try:
+            checkpoint.save_task(task)
+        except Exception as e:
+            self.logger.warning(f"Failed to checkpoint task {task.task_id}: {str(e)}")
+
+    def record_duration(self, task_id: str, duration: float) -> None:
+        """Record an observed task duration used for critical-path estimates"""
+        history = self.duration_history.get(task_id)
+        if history is None:
+            history = self.duration_history[task_id] = deque(maxlen=DURATION_HISTORY_SIZE)
+        history.append(duration)
+        if self._run is None:
+            self._critical_path = None
+
+    def record_kind_duration(self, kind: str, duration: float) -> None:
+        """Record an observed duration of a task kind used to decide speculation"""
+        history = self.kind_durations.get(kind)
+        if history is None:
+            if len(self.kind_durations) >= MAX_TASK_KINDS:
+                return
+            history = self.kind_durations[kind] = deque(maxlen=DURATION_HISTORY_SIZE)
+        history.append(duration)
+
+    def estimate_duration(self, task: Task) -> float:
+        """Estimate a task's duration from its declared value or observed history"""
+        if task.estimated_duration is not None:
+            return task.estimated_duration
+
+        history = self.duration_history.get(task.task_id)
+        if history:
+            return sum(history) / len(history)
+
+        return DEFAULT_TASK_DURATION
+
+    def _remaining_path_lengths(self) -> List[float]:
+        """Longest estimated duration from each task (inclusive) to the end of the DAG, by node id"""
+        graph = self.graph
+        lengths = [0.0] * len(graph)
+        for node in reversed(graph.topological_order()):
+            longest_child = max((lengths[child] for child in graph.successor_ids(node)), default=0.0)
+            lengths[node] = self.estimate_duration(self.tasks[graph.name(node)]) + longest_child
+        return lengths
+
+    def get_critical_path(self) -> Tuple[List[str], float]:
+        """Return the longest estimated dependency chain and its predicted duration
+
+        The predicted duration is the makespan with unbounded concurrency. The
+        result is cached until a task or an edge is added, or an observed
+        duration is recorded outside a run; during a run, new durations are
+        applied when it ends.
+        """
+        if self._critical_path is None:
+            self._critical_path = self._compute_critical_path()
+        path, makespan = self._critical_path
+        return list(path), makespan
+
+    def _compute_critical_path(self) -> Tuple[List[str], float]:
+        if not self.tasks:
+            return [], 0.0
+
+        graph = self.graph
+        lengths = self._remaining_path_lengths()
+        in_degree = graph.in_degrees()
+        node = max((n for n in range(len(graph)) if in_degree[n] == 0), key=lengths.__getitem__)
+        makespan = lengths[node]
+
+        path = [graph.name(node)]
+        children = graph.successor_ids(node)
+        while children:
+            node = max(children, key=lengths.__getitem__)
+            path.append(graph.name(node))
+            children = graph.successor_ids(node)
+
+        return path, makespan
+
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get status of a specific task"""
         task = self.tasks.get(task_id)
@@ -172,22 +1317,44 @@ class TaskDAG:
             ),
             "retry_count": task.retry_count,
             "error": task.error,
+            "cached": task.cached,
         }
 
     def get_dag_status(self) -> Dict[str, Any]:
         """Get status of the entire DAG"""
-        task_counts = {"pending": 0, "running": 0, "completed": 0, "failed": 0}
+        index = self._status_index
+        critical_path, predicted_makespan = self.get_critical_path()
+
+        return {
+            "task_counts": dict(index.counts),
+            "total_tasks": len(self.tasks),
+            "is_running": bool(index.running),
+            "has_failed": bool(index.failed),
+            "critical_path": critical_path,
+            "predicted_makespan": predicted_makespan,
+        }
 
-        for task in self.tasks.values():
-            task_counts[task.status] += 1
+    def status_snapshot(self) -> Dict[str, Any]:
+        """Return task counts and the running and failed task ids without scanning the DAG
 
+        Cost depends only on the number of running and failed tasks, so it is
+        cheap enough to poll on very large DAGs.
+        """
+        index = self._status_index
         return {
-            "task_counts": task_counts,
+            "task_counts": dict(index.counts),
             "total_tasks": len(self.tasks),
-            "is_running": any(t.status == "running" for t in self.tasks.values()),
-            "has_failed": any(t.status == "failed" for t in self.tasks.values()),
+            "running": set(index.running),
+            "failed": set(index.failed),
         }
 
+    def to_networkx(self):
+        """Export the DAG structure as a ``networkx.DiGraph`` with task status attributes"""
+        graph = self.graph.to_networkx()
+        for task_id, task in self.tasks.items():
+            graph.nodes[task_id]["status"] = task.status
+        return graph
+
     def visualize_dag(self) -> str:
         """Generate a DOT representation of the DAG"""
         try:
@@ -197,9 +1364,14 @@ class TaskDAG:
 
             # Add nodes
             for task_id, task in self.tasks.items():
-                color = {"pending": "gray", "running": "yellow", "completed": "green", "failed": "red"}.get(
-                    task.status, "gray"
-                )
+                color = {
+                    "pending": "gray",
+                    "running": "yellow",
+                    "completed": "green",
+                    "failed": "red",
+                    "skipped": "lightgray",
+                    "cancelled": "orange",
+                }.get(task.status, "gray")
 
                 dot.node(task_id, task_id, color=color)
 
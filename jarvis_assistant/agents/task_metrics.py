@@ -0,0 +1,116 @@
+"""Bounded-cardinality labels and per-task timing history for TaskDAG metrics."""
+
+import functools
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+# Distinct task kinds exported as Prometheus label values before new kinds are
+# folded into OVERFLOW_KIND
+MAX_TASK_KINDS = 100
+OVERFLOW_KIND = "other"
+
+# Per-task timings kept in memory by each TaskDAG
+DEFAULT_TIMING_BUFFER_SIZE = 10_000
+
+
+def task_kind(func: Callable) -> str:
+    """Default kind of a task: the qualified name of its function"""
+    target = func.func if isinstance(func, functools.partial) else func
+    return getattr(target, "__qualname__", None) or type(target).__name__
+
+
+class KindLabeler:
+    """Map task kinds to label values, capping how many distinct values exist
+
+    The first ``max_kinds`` kinds seen keep their own label; later kinds share
+    ``OVERFLOW_KIND`` so a stream of unique kinds cannot grow the metric's
+    time series without bound.
+    """
+
+    def __init__(self, max_kinds: int = MAX_TASK_KINDS):
+        self.max_kinds = max_kinds
+        self._kinds: Set[str] = set()
+        self.overflowed = 0
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def label(self, kind: str) -> str:
+        if kind in self._kinds:
+            return kind
+        if len(self._kinds) < self.max_kinds:
+            self._kinds.add(kind)
+            return kind
+        self.overflowed += 1
+        return OVERFLOW_KIND
+
+
+class TaskTiming(NamedTuple):
+    """Outcome and timing of one task execution"""
+
+    task_id: str
+    kind: str
+    status: str
+    start: float
+    duration: float
+    retry_count: int
+    cached: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class TaskTimings:
+    """Ring buffer of the most recent task executions
+
+    Holds exact per-task durations that would be too high-cardinality to
+    export as metrics. Once ``capacity`` entries are stored, each new entry
+    replaces the oldest.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TIMING_BUFFER_SIZE):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._entries: Deque[TaskTiming] = deque(maxlen=capacity)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[TaskTiming]:
+        return iter(self._entries)
+
+    def record(self, timing: TaskTiming) -> None:
+        self._entries.append(timing)
+
+    def query(
+        self,
+        task_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[TaskTiming]:
+        """Return matching entries, oldest first; ``limit`` keeps the newest ones"""
+        entries = [
+            entry
+            for entry in self._entries
+            if (task_id is None or entry.task_id == task_id)
+            and (kind is None or entry.kind == kind)
+            and (status is None or entry.status == status)
+        ]
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return entries
+
+    def export(self, path: Union[str, Path]) -> int:
+        """Write every entry to ``path`` as JSON lines and return how many were written"""
+        entries = list(self._entries)
+        with open(path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry.to_dict()) + "\n")
+        return len(entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,223 @@
+"""Bounded store for executor task results that spills to SQLite."""
+
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from prometheus_client import Counter, Gauge
+
+from .result_cache import deserialize_result, serialize_result
+
+RESULT_STORE_EVENTS = Counter(
+    "task_result_store_events_total",
+    "Result store lookups and movements (memory_hit, disk_hit, miss, spill, expire, drop)",
+    ["event"],
+)
+RESULT_STORE_MEMORY = Gauge("task_result_store_memory_bytes", "Bytes of results held in memory")
+
+_MISSING = object()
+
+
+class TaskResultStore:
+    """Dict-like task results with a memory budget, TTL and LRU eviction
+
+    Results stay in memory while they fit in ``max_bytes``. Once the budget is
+    exceeded the least recently used ones are spilled to a SQLite file, and
+    results of at least ``spill_threshold`` bytes go there directly, so lookups
+    of a dependency still succeed after it leaves memory. Results older than
+    ``ttl`` seconds are forgotten in both tiers. Sizes are measured by pickling;
+    a result that cannot be pickled stays in memory and is dropped instead of
+    spilled.
+
+    Without ``spill_path`` the SQLite file is temporary and deleted by :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = 24 * 3600,
+        spill_path: Optional[Union[str, Path]] = None,
+        spill_threshold: int = 16 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_threshold = min(spill_threshold, max_bytes)
+        self.size = 0
+        self.logger = logging.getLogger("TaskResultStore")
+
+        # key -> (value, size, stored_at); ordered by last use for LRU
+        self._memory: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        # key -> stored_at; ordered by store time for TTL expiry
+        self._ages: "OrderedDict[str, float]" = OrderedDict()
+        self._next_disk_purge = 0.0
+
+        self._owns_spill_file = spill_path is None
+        if spill_path is None:
+            fd, spill_path = tempfile.mkstemp(prefix="task-results-", suffix=".sqlite")
+            os.close(fd)
+        self.spill_path = Path(spill_path)
+        self.conn = sqlite3.connect(str(self.spill_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_results "
+            "(key TEXT PRIMARY KEY, payload BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self._disk_keys = self.conn.execute("SELECT COUNT(*) FROM task_results").fetchone()[0]
+
+        self.stats_counts: Dict[str, int] = dict.fromkeys(
+            ("memory_hit", "disk_hit", "miss", "spill", "expire", "drop"), 0
+        )
+
+    def _count(self, event: str, amount: int = 1) -> None:
+        self.stats_counts[event] += amount
+        RESULT_STORE_EVENTS.labels(event=event).inc(amount)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        now = time.time()
+        self._forget(key)
+        self._expire(now)
+
+        try:
+            payload = serialize_result(value)
+            size = len(payload)
+        except Exception:
+            payload, size = None, sys.getsizeof(value)
+
+        if payload is not None and size >= self.spill_threshold:
+            self._spill(key, payload, now)
+        else:
+            self._memory[key] = (value, size, now)
+            self._ages[key] = now
+            self.size += size
+            self._evict()
+        RESULT_STORE_MEMORY.set(self.size)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key, load=False) is not _MISSING
+
+    def __delitem__(self, key: str) -> None:
+        if not self._forget(key):
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._disk_keys
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key, load=True)
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: str, load: bool) -> Any:
+        """Find a result in memory, then on disk; without ``load`` a disk hit is not unpickled"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if self._expired(entry[2], now):
+                self._expire(now)
+                self._count("miss")
+                return _MISSING
+            self._memory.move_to_end(key)
+            self._count("memory_hit")
+            return entry[0]
+
+        row = None
+        if self._disk_keys:
+            column = "payload" if load else "NULL"
+            row = self.conn.execute(
+                f"SELECT {column}, stored_at FROM task_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or self._expired(row[1], now):
+            self._count("miss")
+            return _MISSING
+        self._count("disk_hit")
+        return deserialize_result(row[0]) if load else True
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _evict(self) -> None:
+        """Spill least recently used results until memory is within budget"""
+        while self.size > self.max_bytes and self._memory:
+            key, (value, size, stored_at) = self._memory.popitem(last=False)
+            del self._ages[key]
+            self.size -= size
+            try:
+                self._spill(key, serialize_result(value), stored_at)
+            except Exception as e:
+                self._count("drop")
+                self.logger.warning(f"Dropped result of task {key} that cannot be spilled: {e}")
+
+    def _spill(self, key: str, payload: bytes, stored_at: float) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO task_results VALUES (?, ?, ?)", (key, payload, stored_at))
+        self.conn.commit()
+        self._disk_keys += 1
+        self._count("spill")
+
+    def _forget(self, key: str) -> bool:
+        """Remove a key from both tiers and return whether it was present"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            del self._ages[key]
+            self.size -= entry[1]
+            RESULT_STORE_MEMORY.set(self.size)
+            return True
+        if not self._disk_keys:
+            return False
+        deleted = self.conn.execute("DELETE FROM task_results WHERE key = ?", (key,)).rowcount
+        if deleted:
+            self.conn.commit()
+            self._disk_keys -= deleted
+        return bool(deleted)
+
+    def _expire(self, now: float) -> None:
+        """Drop results past their TTL: memory entries oldest first, disk at most once a minute"""
+        if self.ttl is None:
+            return
+        cutoff = now - self.ttl
+        while self._ages:
+            key, stored_at = next(iter(self._ages.items()))
+            if stored_at >= cutoff:
+                break
+            del self._ages[key]
+            self.size -= self._memory.pop(key)[1]
+            self._count("expire")
+
+        if self._disk_keys and now >= self._next_disk_purge:
+            self._next_disk_purge = now + 60
+            expired = self.conn.execute("DELETE FROM task_results WHERE stored_at < ?", (cutoff,)).rowcount
+            if expired:
+                self.conn.commit()
+                self._disk_keys -= expired
+                self._count("expire", expired)
+        RESULT_STORE_MEMORY.set(self.size)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats_counts,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "disk_entries": self._disk_keys,
+        }
+
+    def close(self) -> None:
+        self.conn.close()
+        if self._owns_spill_file:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.unlink(f"{self.spill_path}{suffix}")
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,178 @@
+"""Binary websocket frames with a fixed routing header.
+
+A frame is a 22-byte header followed by the encoded payload::
+
+    magic "JW" | version | codec | message type | target | correlation id (16 bytes)
+
+Message type and target are one-byte codes and the correlation id is the raw
+16 bytes of a hex uuid (all zeros when absent), so a router can route a frame
+by reading the header alone and forward it without decoding the payload. The
+payload holds the remaining message fields (``sender``, ``content``), encoded
+with msgpack if it is installed or as UTF-8 JSON otherwise.
+
+Clients opt in by offering the subprotocols from :func:`supported_subprotocols`
+when they connect; connections that offer none keep exchanging JSON text.
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC = b"JW"
+VERSION = 1
+HEADER = struct.Struct(">2sBBBB16s")
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+# Negotiated websocket subprotocol for each payload codec, most compact first
+SUBPROTOCOLS = {"jarvis.v1.msgpack": CODEC_MSGPACK, "jarvis.v1.json": CODEC_JSON}
+
+# Codes are part of the wire format: append new entries, never reorder
+MESSAGE_TYPES = (
+    "agent_status",
+    "task_update",
+    "task_status",
+    "task_status_batch",
+    "task_request",
+    "task_cancel",
+    "browser_command",
+    "browser_response",
+    "interface_action",
+    "direct_message",
+    "disconnect",
+)
+TARGETS = ("all", "agents", "browsers", "interfaces")
+
+_TYPE_CODES = {name: code for code, name in enumerate(MESSAGE_TYPES)}
+_TARGET_CODES = {name: code for code, name in enumerate(TARGETS)}
+_NO_CORRELATION_ID = bytes(16)
+
+
+class FrameHeader(NamedTuple):
+    message_type: str
+    target: str
+    correlation_id: Optional[str]
+    codec: int
+
+
+def supported_subprotocols() -> tuple:
+    """Subprotocols this process can speak, in order of preference"""
+    return tuple(name for name, codec in SUBPROTOCOLS.items() if codec != CODEC_MSGPACK or msgpack is not None)
+
+
+def select_subprotocol(offered: Iterable[str]) -> Optional[str]:
+    """Pick the preferred subprotocol a client offered, or None to stay on JSON text"""
+    offered = set(offered)
+    for name in supported_subprotocols():
+        if name in offered:
+            return name
+    return None
+
+
+def codec_for(subprotocol: Optional[str]) -> Optional[int]:
+    """Payload codec of a negotiated subprotocol; None means JSON text frames"""
+    return SUBPROTOCOLS.get(subprotocol)
+
+
+def _encode_payload(payload: Dict[str, Any], codec: int) -> bytes:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.packb(payload, default=str)
+    return json.dumps(payload, default=str, separators=(",", ":")).encode()
+
+
+def _decode_payload(payload: bytes, codec: int) -> Dict[str, Any]:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.unpackb(payload)
+    return json.loads(payload)
+
+
+def encode_frame(message: Dict[str, Any], codec: int = CODEC_JSON) -> bytes:
+    """Encode a message dict as a binary frame
+
+    Raises ValueError for message types, targets or correlation ids the header
+    cannot represent.
+    """
+    message_type = message.get("message_type")
+    target = message.get("target", "all")
+    correlation_id = message.get("correlation_id")
+    try:
+        type_code = _TYPE_CODES[message_type]
+        target_code = _TARGET_CODES[target]
+    except KeyError as e:
+        raise ValueError(f"Cannot encode {e.args[0]!r} in a frame header") from None
+    if correlation_id is None:
+        correlation = _NO_CORRELATION_ID
+    else:
+        try:
+            correlation = bytes.fromhex(correlation_id)
+        except (TypeError, ValueError):
+            correlation = b""
+        if len(correlation) != 16:
+            raise ValueError(f"Correlation id must be 16 bytes of hex, got {correlation_id!r}")
+
+    payload = {k: v for k, v in message.items() if k not in ("message_type", "target", "correlation_id")}
+    header = HEADER.pack(MAGIC, VERSION, codec, type_code, target_code, correlation)
+    return header + _encode_payload(payload, codec)
+
+
+def read_header(frame: bytes) -> FrameHeader:
+    """Parse only the fixed header of a frame"""
+    if len(frame) < HEADER.size:
+        raise ValueError("Frame is shorter than its header")
+    magic, version, codec, type_code, target_code, correlation = HEADER.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} frame")
+    try:
+        message_type = MESSAGE_TYPES[type_code]
+        target = TARGETS[target_code]
+    except IndexError:
+        raise ValueError("Unknown message type or target code in frame header") from None
+    correlation_id = None if correlation == _NO_CORRELATION_ID else correlation.hex()
+    return FrameHeader(message_type, target, correlation_id, codec)
+
+
+def decode_frame(frame: bytes) -> Dict[str, Any]:
+    """Decode a frame back into the message dict it was encoded from"""
+    header = read_header(frame)
+    message = _decode_payload(frame[HEADER.size :], header.codec)
+    message["message_type"] = header.message_type
+    message["target"] = header.target
+    if header.correlation_id is not None:
+        message["correlation_id"] = header.correlation_id
+    return message
+
+
+def transcode(data: Union[str, bytes], codec: Optional[int]) -> Union[str, bytes]:
+    """Convert a JSON text message or a frame for a connection using ``codec``
+
+    Frames already in the right codec are returned as they are, without
+    decoding their payload. A message the frame header cannot represent (an
+    unknown type or target, or a correlation id that is not 16 bytes of hex)
+    is returned as JSON text, which binary connections accept as well.
+    """
+    if isinstance(data, str):
+        if codec is None:
+            return data
+        try:
+            return encode_frame(json.loads(data), codec)
+        except ValueError:
+            return data
+    if codec is not None and read_header(data).codec == codec:
+        return data
+    message = decode_frame(data)
+    if codec is not None:
+        try:
+            return encode_frame(message, codec)
+        except ValueError:
+            pass
+    return json.dumps(message, default=str)
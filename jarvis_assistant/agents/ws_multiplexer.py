@@ -0,0 +1,53 @@
+"""Correlate request and response frames sent over one shared websocket."""
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class RequestMultiplexer:
+    """Match responses to in-flight requests by a ``correlation_id`` field
+
+    :meth:`request` stamps an outgoing message with a fresh correlation id,
+    sends it and waits on a future of its own. The connection's single reader
+    hands every incoming message to :meth:`dispatch`, which resolves the
+    matching future, so any number of requests can be in flight at once and
+    each times out independently.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        self.send = send
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def request(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send ``message`` and return the response carrying the same correlation id
+
+        Raises ``asyncio.TimeoutError`` if no response arrives within ``timeout`` seconds.
+        """
+        correlation_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+        try:
+            await self.send({**message, "correlation_id": correlation_id})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(correlation_id, None)
+
+    def dispatch(self, message: Dict[str, Any]) -> bool:
+        """Resolve the request a response belongs to; returns False for any other message"""
+        future = self._pending.get(message.get("correlation_id"))
+        if future is None:
+            return False
+        if not future.done():
+            future.set_result(message)
+        return True
+
+    def fail_all(self, error: BaseException) -> None:
+        """Fail every in-flight request, e.g. when the connection drops"""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
@@ -0,0 +1,66 @@
+import pytest
+from jarvis_assistant.agents.dag_graph import CompactGraph
+
+
+def test_add_nodes_and_edges():
+    """Test basic graph construction and lookups"""
+    graph = CompactGraph()
+    graph.add_node("a")
+    graph.add_edge("a", "b")
+    graph.add_edge("a", "c")
+    graph.add_edge("b", "c")
+
+    assert graph.has_node("a") and "c" in graph
+    assert graph.has_edge("a", "b")
+    assert not graph.has_edge("b", "a")
+    assert sorted(graph.successors("a")) == ["b", "c"]
+    assert graph.in_degree("c") == 2
+    assert graph.number_of_nodes() == 3
+    assert graph.number_of_edges() == 3
+    assert list(graph) == ["a", "b", "c"]
+
+
+def test_compaction_preserves_edges():
+    """Test that folding overlay edges into CSR keeps adjacency intact"""
+    graph = CompactGraph()
+    for i in range(3000):
+        graph.add_edge(f"n{i}", f"n{i + 1}")
+        if i and i % 7 == 0:
+            graph.add_edge("n0", f"n{i + 1}")
+
+    graph.compact()
+    graph.add_edge("n5", "n3000")
+
+    assert graph.has_edge("n5", "n3000")
+    assert graph.has_edge("n2999", "n3000")
+    assert graph.in_degree("n3000") == 2
+    assert len(list(graph.successors("n0"))) == 1 + 2999 // 7
+
+
+def test_topological_order():
+    """Test Kahn ordering over integer ids"""
+    graph = CompactGraph()
+    graph.add_edge("c", "d")
+    graph.add_edge("a", "c")
+    graph.add_edge("b", "c")
+
+    order = [graph.name(node) for node in graph.topological_order()]
+
+    assert order.index("a") < order.index("c") < order.index("d")
+    assert order.index("b") < order.index("c")
+
+    graph.add_edge("d", "a")
+    with pytest.raises(ValueError):
+        graph.topological_order()
+
+
+def test_to_networkx():
+    """Test export to networkx"""
+    graph = CompactGraph()
+    graph.add_edge("a", "b")
+    graph.add_node("c")
+
+    exported = graph.to_networkx()
+
+    assert set(exported.nodes) == {"a", "b", "c"}
+    assert list(exported.edges) == [("a", "b")]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from jarvis_assistant.agents.dependency_index import DependencyIndex
+
+
+def test_task_released_when_last_dependency_completes():
+    """Test that completions only release tasks with no remaining dependencies"""
+    index = DependencyIndex()
+
+    assert not index.add("ready", "ready-job", [])
+    assert index.add("report", "report-job", ["fetch", "parse"])
+    assert index.add("notify", "notify-job", ["fetch"])
+
+    assert sorted(index.complete("fetch")) == ["notify-job"]
+    assert index.missing("report") == {"parse"}
+    assert index.complete("fetch") == []
+    assert index.complete("parse") == ["report-job"]
+    assert len(index) == 0
+
+
+def test_removed_and_failed_tasks_are_not_released():
+    index = DependencyIndex()
+    index.add("a", "a-job", ["x", "y"])
+    index.add("b", "b-job", ["y"])
+    index.add("c", "c-job", ["z"])
+
+    assert index.remove("a") == "a-job"
+    assert index.remove("a") is None
+    assert index.fail("y") == ["b-job"]
+    assert index.complete("x") == []
+    assert "c" in index
+
+    with pytest.raises(ValueError):
+        index.add("c", "again", ["w"])
+
+
+@pytest.mark.asyncio
+async def test_waiting_task_times_out():
+    """Test that a dependency which never arrives times the waiting task out"""
+    expired = []
+    index = DependencyIndex(on_timeout=lambda key, item, missing: expired.append((key, item, missing)))
+
+    index.add("slow", "slow-job", ["never"], timeout=0.01)
+    index.add("fast", "fast-job", ["soon"], timeout=0.01)
+    assert index.complete("soon") == ["fast-job"]
+
+    await asyncio.sleep(0.05)
+
+    assert expired == [("slow", "slow-job", {"never"})]
+    assert len(index) == 0
+    assert index.complete("never") == []
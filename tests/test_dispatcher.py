@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from jarvis_assistant.agents.dispatcher import PriorityDispatcher, QueueFullError
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_by_priority_on_bounded_workers():
+    """Test that queued jobs start lowest priority value first, FIFO within a priority"""
+    started = []
+    running = 0
+    peak = 0
+
+    async def handler(job):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        started.append(job)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    dispatcher = PriorityDispatcher(handler, workers=2, max_queue_depth=10)
+    dispatcher.start()
+
+    assert dispatcher.submit("first", "first", priority=9) is False
+    assert dispatcher.submit("second", "second", priority=9) is False
+    await asyncio.sleep(0)
+    assert dispatcher.submit("low", "low", priority=9) is True
+    assert dispatcher.submit("urgent", "urgent", priority=1) is True
+    assert dispatcher.submit("urgent2", "urgent2", priority=1) is True
+
+    await dispatcher.stop()
+
+    assert started == ["first", "second", "urgent", "urgent2", "low"]
+    assert peak == 2
+    stats = dispatcher.stats()
+    assert stats["dispatched"] == 5
+    assert stats["queue_depth"] == 0
+    assert stats["max_wait"] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_queued_jobs_can_be_cancelled():
+    """Test backpressure at the depth limit and cancellation of waiting jobs"""
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(job):
+        handled.append(job)
+        await release.wait()
+
+    dispatcher = PriorityDispatcher(handler, workers=1, max_queue_depth=2)
+    dispatcher.start()
+
+    dispatcher.submit("busy", "busy")
+    await asyncio.sleep(0)
+    dispatcher.submit("a", "a")
+    dispatcher.submit("b", "b")
+    with pytest.raises(QueueFullError):
+        dispatcher.submit("c", "c")
+
+    assert dispatcher.cancel("a")
+    assert not dispatcher.cancel("a")
+    assert dispatcher.depth == 1
+
+    release.set()
+    await dispatcher.stop()
+
+    assert handled == ["busy", "b"]
+    assert dispatcher.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_do_not_stop_workers():
+    handled = []
+
+    async def handler(job):
+        handled.append(job)
+        if job == "bad":
+            raise ValueError("boom")
+
+    dispatcher = PriorityDispatcher(handler, workers=1)
+    dispatcher.start()
+    dispatcher.submit(1, "bad")
+    dispatcher.submit(2, "good")
+    await dispatcher.stop()
+
+    assert handled == ["bad", "good"]
+
+
+@pytest.mark.asyncio
+async def test_jobs_waiting_for_resources_do_not_hold_workers():
+    """Test that a job whose tokens are exhausted leaves its worker to other jobs"""
+    from jarvis_assistant.agents.resources import ResourcePool
+
+    pool = ResourcePool({"db_conn": 1, "cpu": 4})
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    started = {}
+    in_use = 0
+    peak = 0
+
+    async def handler(job):
+        nonlocal in_use, peak
+        name, _ = job
+        started[name] = loop.time() - began
+        if name.startswith("db"):
+            in_use += 1
+            peak = max(peak, in_use)
+        await asyncio.sleep(0.1)
+        if name.startswith("db"):
+            in_use -= 1
+
+    dispatcher = PriorityDispatcher(
+        handler, workers=2, max_queue_depth=10, resources=pool, requirements=lambda job: job[1]
+    )
+    dispatcher.start()
+    for i in range(3):
+        dispatcher.submit(f"db{i}", (f"db{i}", {"db_conn": 1}))
+    dispatcher.submit("cpu", ("cpu", {"cpu": 1}))
+
+    await dispatcher.stop()
+
+    assert started["cpu"] < 0.05
+    assert started["db2"] >= 0.2
+    assert peak == 1
+    assert pool.available == {"db_conn": 1, "cpu": 4}
+    assert dispatcher.stats()["dispatched"] == 4
@@ -0,0 +1,37 @@
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from jarvis_assistant.agents.http_client import PooledHTTPClient  # noqa: E402
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connections():
+    """Test keep-alive reuse across requests and graceful close"""
+
+    async def handler(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    server = TestServer(app)
+    await server.start_server()
+
+    client = PooledHTTPClient(limit=4, limit_per_host=2)
+    try:
+        for _ in range(5):
+            async with client.request("get", str(server.make_url("/"))) as response:
+                assert await response.json() == {"ok": True}
+
+        stats = client.stats()
+        assert stats["requests"] == 5
+        assert stats["connections_created"] == 1
+        assert stats["handshakes_saved"] == 4
+        assert stats["in_flight"] == 0
+    finally:
+        await client.close()
+        await server.close()
+
+    assert client.closed
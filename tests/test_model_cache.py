@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from jarvis_assistant.agents.model_cache import ModelCache, estimate_model_bytes
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+
+def make_cache(max_bytes=250, load_time=0.0):
+    loads = []
+    lock = threading.Lock()
+
+    def loader(name):
+        time.sleep(load_time)
+        with lock:
+            loads.append(name)
+        if name == "broken":
+            raise OSError("model not found")
+        return FakeModel(name)
+
+    return ModelCache(max_bytes=max_bytes, loader=loader, sizer=lambda model: 100), loads
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_load_a_model_once():
+    """Test single-flight loading of a model requested by many tasks at once"""
+    cache, loads = make_cache(load_time=0.05)
+
+    models = await asyncio.gather(*(cache.get("sentiment") for _ in range(10)))
+
+    assert loads == ["sentiment"]
+    assert all(model is models[0] for model in models)
+    assert cache.stats()["coalesced"] == 9
+    assert await cache.get("sentiment") is models[0]
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_models_are_evicted_over_budget():
+    cache, loads = make_cache(max_bytes=250)
+
+    await cache.get("a")
+    await cache.get("b")
+    await cache.get("a")
+    await cache.get("c")
+
+    assert "b" not in cache
+    assert cache.stats()["models"] == ["a", "c"]
+    assert cache.size == 200
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_loads_are_retried_and_preload_logs_failures():
+    cache, loads = make_cache()
+
+    with pytest.raises(OSError):
+        await cache.get("broken")
+    with pytest.raises(OSError):
+        await cache.get("broken")
+    assert loads == ["broken", "broken"]
+
+    await cache.preload(["warm", "broken"])
+    assert "warm" in cache and "broken" not in cache
+
+
+def test_estimate_model_bytes_sums_tensors():
+    class Tensor:
+        def __init__(self, count):
+            self.count = count
+
+        def numel(self):
+            return self.count
+
+        def element_size(self):
+            return 4
+
+    class Module:
+        def parameters(self):
+            return [Tensor(10), Tensor(5)]
+
+        def buffers(self):
+            return [Tensor(1)]
+
+    class Pipeline:
+        model = Module()
+
+    assert estimate_model_bytes(Pipeline()) == 64
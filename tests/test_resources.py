@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from jarvis_assistant.agents.resources import ResourcePool
+
+
+def test_try_acquire_is_all_or_nothing():
+    """Test that a partial match takes no tokens"""
+    pool = ResourcePool({"cpu": 2, "db_conn": 1})
+
+    assert pool.try_acquire({"cpu": 1, "db_conn": 1})
+    assert not pool.try_acquire({"cpu": 1, "db_conn": 1})
+    assert pool.available == {"cpu": 1, "db_conn": 0}
+
+    pool.release({"cpu": 1, "db_conn": 1})
+    assert pool.snapshot() == {
+        "cpu": {"capacity": 2, "available": 2},
+        "db_conn": {"capacity": 1, "available": 1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_reserve_waits_for_release():
+    """Test that reserve blocks until enough tokens are returned"""
+    pool = ResourcePool({"db_conn": 1})
+    order = []
+
+    async def worker(name):
+        async with pool.reserve({"db_conn": 1}):
+            order.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} end")
+
+    await asyncio.gather(worker("a"), worker("b"))
+
+    assert order == ["a start", "a end", "b start", "b end"]
+    assert pool.available == {"db_conn": 1}
+
+
+def test_validate_rejects_unsatisfiable_requirements():
+    pool = ResourcePool({"cpu": 2})
+
+    with pytest.raises(ValueError, match="Unknown resource"):
+        pool.validate({"gpu": 1})
+    with pytest.raises(ValueError, match="exceeds its capacity"):
+        pool.validate({"cpu": 4})
+    with pytest.raises(ValueError):
+        ResourcePool({"cpu": 0})
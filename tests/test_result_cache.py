@@ -0,0 +1,96 @@
+import pytest
+
+from jarvis_assistant.agents.result_cache import DiskResultStore, MemoryResultStore, cache_key
+
+
+def test_memory_store_evicts_least_recently_used():
+    """Test size-based LRU eviction of the in-memory store"""
+    store = MemoryResultStore(max_bytes=10)
+    store.put("a", b"aaaa")
+    store.put("b", b"bbbb")
+    store.get("a")
+    store.put("c", b"cccc")
+
+    assert store.get("b") is None
+    assert store.get("a") == b"aaaa"
+    assert store.get("c") == b"cccc"
+    assert store.size == 8
+
+
+def test_disk_store_persists_and_evicts(tmp_path):
+    """Test the on-disk store survives reopening and respects its budget"""
+    store = DiskResultStore(tmp_path, max_bytes=10)
+    store.put("a", b"aaaa")
+    store.put("b", b"bbbb")
+
+    reopened = DiskResultStore(tmp_path, max_bytes=10)
+    assert reopened.get("a") == b"aaaa"
+
+    reopened.put("c", b"cccc")
+    assert reopened.get("b") is None
+    assert len(list(tmp_path.glob("*.result"))) == 2
+
+
+def test_cache_key_depends_on_inputs():
+    """Test that the key changes with arguments and upstream results"""
+
+    def func(x, scale=1):
+        return x * scale
+
+    key = cache_key(func, [1], {"scale": 2}, {"dep": "abc"})
+
+    assert key == cache_key(func, [1], {"scale": 2}, {"dep": "abc"})
+    assert key != cache_key(func, [2], {"scale": 2}, {"dep": "abc"})
+    assert key != cache_key(func, [1], {"scale": 3}, {"dep": "abc"})
+    assert key != cache_key(func, [1], {"scale": 2}, {"dep": "abd"})
+
+
+def test_cache_key_depends_on_closure_state():
+    """Test that closures built by one factory get different keys"""
+    import functools
+    import threading
+
+    def make(value):
+        def func():
+            return value
+
+        return func
+
+    assert cache_key(make("A"), [], {}, {}) == cache_key(make("A"), [], {}, {})
+    assert cache_key(make("A"), [], {}, {}) != cache_key(make("B"), [], {}, {})
+
+    def scale(x, factor=1):
+        return x * factor
+
+    assert cache_key(functools.partial(scale, factor=2), [1], {}, {}) == cache_key(
+        functools.partial(scale, factor=2), [1], {}, {}
+    )
+    assert cache_key(functools.partial(scale, factor=2), [1], {}, {}) != cache_key(
+        functools.partial(scale, factor=3), [1], {}, {}
+    )
+
+    with pytest.raises(Exception):
+        cache_key(make(threading.Lock()), [], {}, {})
+
+
+def test_cache_key_depends_on_nested_code():
+    """Test that editing a comprehension or lambda inside a task changes its key"""
+
+    def double(xs):
+        return [x * 2 for x in xs]
+
+    def triple(xs):
+        return [x * 3 for x in xs]
+
+    def add_one(xs):
+        return list(map(lambda x: x + 1, xs))
+
+    def add_two(xs):
+        return list(map(lambda x: x + 2, xs))
+
+    # Give each pair one qualname so only the body differs
+    triple.__qualname__ = double.__qualname__
+    add_two.__qualname__ = add_one.__qualname__
+
+    assert cache_key(double, [[1]], {}, {}) != cache_key(triple, [[1]], {}, {})
+    assert cache_key(add_one, [[1]], {}, {}) != cache_key(add_two, [[1]], {}, {})
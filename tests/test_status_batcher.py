@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from jarvis_assistant.agents.status_batcher import StatusBatcher
+
+
+def make_batcher(interval=0.05, max_batch=100):
+    batches = []
+
+    async def send(updates):
+        batches.append(updates)
+
+    return StatusBatcher(send, interval, max_batch), batches
+
+
+@pytest.mark.asyncio
+async def test_updates_are_sent_as_one_batch_after_the_interval():
+    batcher, batches = make_batcher(interval=0.02)
+
+    for i in range(5):
+        batcher.update(f"task{i}", {"task_id": f"task{i}", "status": "started"})
+    assert batches == []
+
+    await asyncio.sleep(0.05)
+    assert len(batches) == 1
+    assert [update["task_id"] for update in batches[0]] == [f"task{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_latest_status_of_a_task_wins():
+    """Test a task changing status within one window sends only its last status"""
+    batcher, batches = make_batcher()
+
+    batcher.update("task1", {"task_id": "task1", "status": "started"})
+    batcher.update("task2", {"task_id": "task2", "status": "started"})
+    batcher.update("task1", {"task_id": "task1", "status": "completed", "result": 42})
+
+    assert await batcher.flush() == 2
+    assert batches == [
+        [
+            {"task_id": "task1", "status": "completed", "result": 42},
+            {"task_id": "task2", "status": "started"},
+        ]
+    ]
+    assert batcher.stats()["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_the_interval():
+    batcher, batches = make_batcher(interval=10, max_batch=3)
+
+    for i in range(7):
+        batcher.update(i, {"task_id": i})
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert len(batcher) == 0
+
+    batcher.update(7, {"task_id": 7})
+    await batcher.close()
+    assert [len(batch) for batch in batches] == [3, 3, 1, 1]
+    assert batcher.stats()["updates_per_batch"] == 2
+
+
+@pytest.mark.asyncio
+async def test_send_errors_are_logged_and_later_batches_still_go_out(caplog):
+    calls = []
+
+    async def send(updates):
+        calls.append(updates)
+        if len(calls) == 1:
+            raise ConnectionError("socket closed")
+
+    batcher = StatusBatcher(send, interval=0.01)
+    batcher.update("a", {"task_id": "a"})
+    await asyncio.sleep(0.03)
+    batcher.update("b", {"task_id": "b"})
+    await asyncio.sleep(0.03)
+
+    assert calls == [[{"task_id": "a"}], [{"task_id": "b"}]]
+    assert "Failed to send status batch" in caplog.text
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        StatusBatcher(lambda updates: None, max_batch=0)
@@ -1,17 +1,22 @@
 import pytest
 import asyncio
+import os
 import networkx as nx
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
-from jarvis_assistant.agents.task_dag import TaskDAG, Task
+from jarvis_assistant.agents.task_dag import TaskDAG, Task, TaskEvent
 
 
 @pytest.fixture
-async def task_dag():
+def task_dag():
     """Create a TaskDAG instance for testing"""
     return TaskDAG()
 
 
+# Calls recorded by memoized test tasks
+memo_calls = []
+
+
 async def dummy_task():
     """Dummy task for testing"""
     await asyncio.sleep(0.1)
@@ -188,3 +193,901 @@ async def test_visualize_dag(task_dag):
     assert "task1" in dot
     assert "task2" in dot
     assert "task3" in dot
+
+
+@pytest.mark.asyncio
+async def test_execute_dag_runs_independent_tasks_concurrently(task_dag):
+    """Test that independent branches overlap instead of running one after another"""
+    task_dag.add_task(Task("root", dummy_task))
+    for i in range(10):
+        task_dag.add_task(Task(f"fetch{i}", dummy_task, dependencies={"root"}))
+
+    result = await task_dag.execute_dag()
+
+    assert len(result["results"]) == 11
+    assert all(task.status == "completed" for task in task_dag.tasks.values())
+    # root + one wave of fetches, not eleven sequential sleeps
+    assert result["duration"] < 0.6
+
+
+@pytest.mark.asyncio
+async def test_execute_dag_max_concurrency(task_dag):
+    """Test that max_concurrency bounds the number of running tasks"""
+    running = 0
+    peak = 0
+
+    async def tracked_task():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return "done"
+
+    for i in range(8):
+        task_dag.add_task(Task(f"task{i}", tracked_task))
+
+    result = await task_dag.execute_dag(max_concurrency=3)
+
+    assert peak == 3
+    assert set(result["results"]) == {f"task{i}" for i in range(8)}
+
+
+@pytest.mark.asyncio
+async def test_add_tasks_bulk(task_dag):
+    """Test bulk insertion with dependencies declared in any order"""
+    task_dag.add_task(Task("source", dummy_task))
+    task_dag.add_tasks(
+        [
+            Task("reduce", dummy_task, dependencies={"parse1", "parse2"}),
+            Task("parse1", dummy_task, dependencies={"source"}),
+            Task("parse2", dummy_task, dependencies={"source"}),
+        ]
+    )
+
+    assert set(task_dag.tasks) == {"source", "parse1", "parse2", "reduce"}
+    assert task_dag.graph.has_edge("parse1", "reduce")
+
+    result = await task_dag.execute_dag()
+    assert len(result["results"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_add_tasks_reports_errors_atomically(task_dag):
+    """Test that a rejected batch reports the problem and adds nothing"""
+    with pytest.raises(ValueError, match="Dependency missing not found"):
+        task_dag.add_tasks([Task("a", dummy_task), Task("b", dummy_task, dependencies={"missing"})])
+
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        task_dag.add_tasks(
+            [
+                Task("a", dummy_task, dependencies={"c"}),
+                Task("b", dummy_task, dependencies={"a"}),
+                Task("c", dummy_task, dependencies={"b"}),
+            ]
+        )
+
+    assert task_dag.tasks == {}
+    assert task_dag.graph.number_of_nodes() == 0
+
+    with pytest.raises(ValueError, match="cycle: a -> a"):
+        task_dag.add_task(Task("a", dummy_task, dependencies={"a"}))
+    with pytest.raises(ValueError, match="Dependency missing not found"):
+        task_dag.add_task(Task("a", dummy_task, dependencies={"missing"}))
+    assert task_dag.tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_critical_path_tasks_start_first(task_dag):
+    """Test that bounded execution starts tasks on the critical path first"""
+    started = []
+
+    def make_task(name):
+        async def run():
+            started.append(name)
+            await asyncio.sleep(0.01)
+            return name
+
+        return run
+
+    task_dag.add_task(Task("short1", make_task("short1"), estimated_duration=1))
+    task_dag.add_task(Task("short2", make_task("short2"), estimated_duration=1))
+    task_dag.add_task(Task("long_head", make_task("long_head"), estimated_duration=1))
+    task_dag.add_task(Task("long_tail", make_task("long_tail"), dependencies={"long_head"}, estimated_duration=5))
+
+    await task_dag.execute_dag(max_concurrency=1)
+
+    assert started[0] == "long_head"
+
+
+@pytest.mark.asyncio
+async def test_dag_status_reports_critical_path(task_dag):
+    """Test critical path and predicted makespan from declared and observed durations"""
+    task_dag.add_task(Task("fetch", dummy_task, estimated_duration=2.0))
+    task_dag.add_task(Task("parse", dummy_task, dependencies={"fetch"}, estimated_duration=3.0))
+    task_dag.add_task(Task("side", dummy_task, dependencies={"fetch"}))
+    task_dag.record_duration("side", 10.0)
+    task_dag.record_duration("side", 6.0)
+
+    status = task_dag.get_dag_status()
+
+    assert status["critical_path"] == ["fetch", "side"]
+    assert status["predicted_makespan"] == pytest.approx(10.0)
+
+
+@pytest.mark.asyncio
+async def test_memoized_tasks_skip_execution_on_cache_hit():
+    """Test that memoized results are reused across runs until an input changes"""
+    from jarvis_assistant.agents.result_cache import MemoryResultStore
+
+    store = MemoryResultStore()
+    # Module-level, since closure contents are part of the memo key
+    calls = memo_calls
+    calls.clear()
+
+    def load(value):
+        memo_calls.append("load")
+        return value
+
+    def double(dep_results):
+        memo_calls.append("double")
+        return dep_results["load"] * 2
+
+    async def run(value):
+        dag = TaskDAG(result_store=store)
+        dag.add_task(Task("load", load, args=[value], memoize=True))
+        dag.add_task(Task("double", double, dependencies={"load"}, memoize=True))
+        return dag, await dag.execute_dag()
+
+    _, first = await run(21)
+    dag, second = await run(21)
+
+    assert first["results"] == second["results"] == {"load": 21, "double": 42}
+    assert calls == ["load", "double"]
+    assert all(task.cached for task in dag.tasks.values())
+    assert dag.get_task_status("double")["cached"] is True
+
+    _, third = await run(5)
+    assert third["results"]["double"] == 10
+    assert calls == ["load", "double", "load", "double"]
+
+
+@pytest.mark.asyncio
+async def test_memoized_closures_from_one_factory_do_not_share_results():
+    """Test that the memo key covers closure state, not just the function's code"""
+
+    def make(value):
+        async def produce():
+            return value
+
+        return produce
+
+    dag = TaskDAG()
+    dag.add_task(Task("a", make("A"), memoize=True))
+    dag.add_task(Task("b", make("B"), memoize=True))
+
+    result = await dag.execute_dag()
+
+    assert result["results"] == {"a": "A", "b": "B"}
+
+
+@pytest.mark.asyncio
+async def test_resume_from_checkpoint(tmp_path):
+    """Test that a resumed run reloads completed tasks and only runs the rest"""
+    checkpoint = tmp_path / "dag.sqlite"
+    calls = []
+    fail = True
+
+    def step(name):
+        def run():
+            calls.append(name)
+            if name == "last" and fail:
+                raise RuntimeError("process died")
+            return f"{name} result"
+
+        return run
+
+    def build():
+        dag = TaskDAG()
+        dag.add_task(Task("first", step("first")))
+        dag.add_task(Task("second", step("second"), dependencies={"first"}))
+        dag.add_task(Task("last", step("last"), dependencies={"second"}))
+        return dag
+
+    with pytest.raises(RuntimeError):
+        await build().execute_dag(checkpoint=checkpoint)
+    assert calls == ["first", "second", "last"]
+
+    fail = False
+    dag = build()
+    result = await dag.execute_dag(resume_from=checkpoint)
+
+    assert calls == ["first", "second", "last", "last"]
+    assert result["results"] == {"first": "first result", "second": "second result", "last": "last result"}
+    assert dag.tasks["first"].status == "completed"
+
+
+def blocking_task(duration):
+    """Synchronous task that blocks its worker"""
+    import time
+
+    time.sleep(duration)
+    return os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_pooled_tasks_do_not_block_event_loop(task_dag):
+    """Test that thread and process tasks run off the event loop"""
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    task_dag.add_task(Task("thread", blocking_task, args=[0.2], executor="thread"))
+    task_dag.add_task(Task("process", blocking_task, args=[0.2], executor="process"))
+
+    try:
+        result, _ = await asyncio.gather(task_dag.execute_dag(), heartbeat())
+    finally:
+        task_dag.shutdown()
+
+    assert ticks == 5
+    assert result["results"]["thread"] == os.getpid()
+    assert result["results"]["process"] != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_pooled_task_timeout_and_retries(task_dag):
+    """Test that timeout and retries apply to thread tasks like inline ones"""
+    attempts = 0
+
+    def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 2:
+            raise ValueError("Temporary failure")
+        return "ok"
+
+    flaky_task = Task("flaky", flaky, executor="thread", retries=1, retry_delay=0.01)
+    slow_task = Task("slow", blocking_task, args=[0.3], executor="thread", timeout=0.05)
+    task_dag.add_task(flaky_task)
+    task_dag.add_task(slow_task)
+
+    try:
+        assert await task_dag.execute_task(flaky_task) == "ok"
+        with pytest.raises(asyncio.TimeoutError):
+            await task_dag.execute_task(slow_task)
+    finally:
+        task_dag.shutdown()
+
+    assert attempts == 2
+    assert slow_task.status == "failed"
+
+    with pytest.raises(ValueError):
+        Task("bad", dummy_task, executor="process")
+
+
+def large_payload():
+    return b"x" * (2 * 1024 * 1024)
+
+
+def describe_payload(dep_results):
+    payload = dep_results["produce"]
+    return type(payload).__name__, len(payload), bytes(payload[:1])
+
+
+def sum_array(dep_results):
+    array = dep_results["produce"]
+    return type(array).__name__, array.flags.writeable, int(array.sum())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spill", [False, True])
+async def test_large_results_reach_process_tasks_through_shared_memory(tmp_path, spill):
+    """Test that large results are passed to process tasks as zero-copy views and then freed"""
+    dag = TaskDAG(spill_dir=tmp_path if spill else None)
+    dag.add_task(Task("produce", large_payload))
+    dag.add_task(Task("consume1", describe_payload, dependencies={"produce"}, executor="process"))
+    dag.add_task(Task("consume2", describe_payload, dependencies={"produce"}, executor="process"))
+
+    try:
+        result = await dag.execute_dag()
+    finally:
+        dag.shutdown()
+
+    assert result["results"]["consume1"] == ("memoryview", 2 * 1024 * 1024, b"x")
+    assert result["results"]["consume2"] == ("memoryview", 2 * 1024 * 1024, b"x")
+    assert len(dag._shared_results) == 0
+    assert list(tmp_path.glob("*.spill")) == []
+
+
+@pytest.mark.asyncio
+async def test_shared_results_are_freed_once_their_last_real_consumer_finishes():
+    """Test that process successors without dep_results, or that are skipped, do not pin a shared result"""
+    dag = TaskDAG()
+    outstanding = []
+
+    async def check():
+        outstanding.append(len(dag._shared_results))
+
+    dag.add_task(Task("produce", large_payload))
+    dag.add_task(Task("bad", failing_task))
+    dag.add_task(Task("consume", describe_payload, dependencies={"produce"}, executor="process"))
+    dag.add_task(Task("ignore", blocking_task, args=[0], dependencies={"produce"}, executor="process"))
+    dag.add_task(Task("skipped", describe_payload, dependencies={"produce", "bad"}, executor="process"))
+    dag.add_task(Task("check", check, dependencies={"consume"}))
+
+    try:
+        result = await dag.execute_dag(failure_policy="best_effort")
+    finally:
+        dag.shutdown()
+
+    assert result["results"]["consume"] == ("memoryview", 2 * 1024 * 1024, b"x")
+    assert result["skipped"] == ["skipped"]
+    assert outstanding == [0]
+
+
+@pytest.mark.asyncio
+async def test_large_arrays_reach_process_tasks_as_read_only_views():
+    """Test zero-copy NumPy array hand-off"""
+    np = pytest.importorskip("numpy")
+    dag = TaskDAG(shared_result_threshold=1024)
+    dag.add_task(Task("produce", np.ones, args=[(512, 4)]))
+    dag.add_task(Task("sum", sum_array, dependencies={"produce"}, executor="process"))
+
+    try:
+        result = await dag.execute_dag()
+    finally:
+        dag.shutdown()
+
+    assert result["results"]["sum"] == ("ndarray", False, 2048)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_events_as_tasks_finish(task_dag):
+    """Test streaming task events during execution"""
+    task_dag.add_task(Task("task1", dummy_task))
+    task_dag.add_task(Task("task2", dummy_task, dependencies={"task1"}))
+
+    events = []
+    async for event in task_dag.stream():
+        events.append((event.event, event.task_id))
+        if event.event == "completed":
+            assert event.result == "dummy result"
+
+    assert events == [
+        ("started", "task1"),
+        ("completed", "task1"),
+        ("started", "task2"),
+        ("completed", "task2"),
+    ]
+
+    message = TaskEvent("completed", "task2", 0.0, "dummy result").to_message("task-dag")
+    assert message["message_type"] == "task_update"
+    assert message["content"]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_stream_raises_after_failure_events(task_dag):
+    """Test that a failed run surfaces its error after the failure event"""
+    task_dag.add_task(Task("task1", failing_task))
+
+    events = []
+    with pytest.raises(RuntimeError):
+        async for event in task_dag.stream():
+            events.append(event.event)
+
+    assert events == ["started", "failed"]
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_early_marks_running_tasks_cancelled(task_dag):
+    """Test that abandoning a streamed run does not leave tasks stuck in running"""
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    task_dag.add_task(Task("s", slow))
+
+    stream = task_dag.stream()
+    assert (await stream.__anext__()).event == "started"
+    await stream.aclose()
+    await asyncio.sleep(0)
+
+    snapshot = task_dag.status_snapshot()
+    assert snapshot["running"] == set()
+    assert snapshot["task_counts"]["running"] == 0
+    assert snapshot["task_counts"]["cancelled"] == 1
+    assert task_dag.tasks["s"].end_time is not None
+
+
+@pytest.mark.asyncio
+async def test_running_tasks_can_fan_out(task_dag):
+    """Test adding child tasks and edges to a DAG while it executes"""
+    files = ["a.txt", "b.txt", "c.txt"]
+
+    async def parse(name):
+        await asyncio.sleep(0.01)
+        return name.upper()
+
+    async def list_files():
+        for name in files:
+            task_dag.add_task(Task(f"parse:{name}", parse, args=[name], dependencies={"list"}))
+            task_dag.add_dependency("reduce", f"parse:{name}")
+        return files
+
+    def reduce(dep_results):
+        return sorted(value for key, value in dep_results.items() if key.startswith("parse:"))
+
+    task_dag.add_task(Task("list", list_files))
+    task_dag.add_task(Task("reduce", reduce, dependencies={"list"}))
+
+    result = await task_dag.execute_dag()
+
+    assert result["results"]["reduce"] == ["A.TXT", "B.TXT", "C.TXT"]
+    assert len(result["results"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_dynamic_edges_are_checked_for_cycles(task_dag):
+    """Test that edges added at runtime are still validated"""
+    errors = []
+
+    async def spawn():
+        task_dag.add_task(Task("child", dummy_task))
+        try:
+            task_dag.add_dependency("downstream", "late")
+        except ValueError as e:
+            errors.append(str(e))
+        return "spawned"
+
+    task_dag.add_task(Task("spawn", spawn))
+    task_dag.add_task(Task("downstream", dummy_task, dependencies={"spawn"}))
+    task_dag.add_task(Task("late", dummy_task, dependencies={"downstream"}))
+
+    result = await task_dag.execute_dag()
+
+    assert errors == ["Adding this dependency would create a cycle: downstream -> late -> downstream"]
+    assert set(result["results"]) == {"spawn", "downstream", "late", "child"}
+
+
+@pytest.mark.asyncio
+async def test_rerun_dirty_recomputes_only_downstream(task_dag):
+    """Test that invalidating a task re-executes just its descendants"""
+    calls = []
+    inputs = {"raw": 1}
+
+    def step(name):
+        def run(dep_results=None):
+            calls.append(name)
+            if name == "load":
+                return inputs["raw"]
+            return sum(dep_results.values()) + 1 if dep_results else 0
+
+        return run
+
+    task_dag.add_task(Task("load", step("load")))
+    task_dag.add_task(Task("transform", step("transform"), dependencies={"load"}))
+    task_dag.add_task(Task("report", step("report"), dependencies={"transform"}))
+    task_dag.add_task(Task("unrelated", step("unrelated")))
+
+    await task_dag.execute_dag()
+    calls.clear()
+
+    inputs["raw"] = 10
+    assert task_dag.invalidate("load") == {"load", "transform", "report"}
+    assert task_dag.tasks["report"].status == "pending"
+    assert task_dag.tasks["unrelated"].status == "completed"
+
+    result = await task_dag.rerun_dirty()
+
+    assert sorted(calls) == ["load", "report", "transform"]
+    assert result["results"] == {"load": 10, "transform": 11, "report": 12, "unrelated": 0}
+    assert task_dag.dirty == set()
+
+
+@pytest.mark.asyncio
+async def test_rerun_dirty_leaves_clean_failed_tasks_alone(task_dag):
+    """Test that a rerun does not retry clean tasks that failed, nor run tasks downstream of them"""
+    calls = []
+
+    def fails_once():
+        calls.append("a")
+        if len(calls) == 1:
+            raise ValueError("first run fails")
+        return 0
+
+    task_dag.add_task(Task("a", fails_once))
+    task_dag.add_task(Task("after_a", dummy_task, dependencies={"a"}))
+    task_dag.add_task(Task("b", dummy_task))
+    task_dag.add_task(Task("c", dummy_task, dependencies={"b"}))
+    task_dag.add_task(Task("d", dummy_task, dependencies={"a", "b"}))
+
+    first = await task_dag.execute_dag(failure_policy="best_effort")
+    assert first["failed"] == {"a": "first run fails"}
+
+    assert task_dag.invalidate("b") == {"b", "c", "d"}
+    result = await task_dag.rerun_dirty(failure_policy="best_effort")
+
+    assert calls == ["a"]
+    assert set(result["results"]) == {"b", "c"}
+    assert result["failed"] == {}
+    assert task_dag.tasks["a"].status == "failed"
+    assert task_dag.tasks["d"].status == "skipped"
+    assert task_dag.dirty == {"d"}
+    assert task_dag.get_dag_status()["task_counts"].get("running", 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_start_from_zero_on_every_execution(task_dag):
+    """Test that a task run again gets its full retry budget"""
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        raise ValueError("always fails")
+
+    task_dag.add_task(Task("flaky", flaky, retries=1, retry_delay=0))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await task_dag.execute_task(task_dag.tasks["flaky"])
+
+    assert len(attempts) == 4
+    assert task_dag.tasks["flaky"].status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_speculative_attempt_for_straggling_idempotent_task(task_dag):
+    """Test that a duplicate attempt rescues an idempotent straggler"""
+    from prometheus_client import REGISTRY
+
+    def won_count():
+        return REGISTRY.get_sample_value("task_dag_speculative_attempts_total", {"outcome": "won"}) or 0
+
+    calls = 0
+    cancelled = []
+
+    async def flaky_endpoint():
+        nonlocal calls
+        calls += 1
+        try:
+            await asyncio.sleep(5 if calls == 1 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(calls)
+            raise
+        return "response"
+
+    task = Task("fetch", flaky_endpoint, idempotent=True)
+    task_dag.add_task(task)
+    for _ in range(5):
+        task_dag.record_kind_duration(task.kind, 0.02)
+
+    before = won_count()
+    result = await asyncio.wait_for(task_dag.execute_task(task), timeout=1)
+
+    assert result == "response"
+    assert calls == 2
+    assert cancelled == [2]
+    assert won_count() == before + 1
+
+    plain = Task("plain", flaky_endpoint)
+    assert task_dag._speculation_delay(plain) is None
+
+
+@pytest.mark.asyncio
+async def test_speculation_uses_durations_of_peer_tasks_across_dags():
+    """Test that a new task is speculated on from the history of its kind, shared between DAGs"""
+    first = TaskDAG()
+    for i in range(5):
+        first.add_task(Task(f"page{i}", dummy_task, kind="fetch_page"))
+    await first.execute_dag()
+
+    second = TaskDAG(kind_durations=first.kind_durations)
+    straggler = Task("page5", dummy_task, idempotent=True, kind="fetch_page")
+    other = Task("report", dummy_task, idempotent=True)
+    second.add_task(straggler)
+    second.add_task(other)
+
+    assert 0.1 <= second._speculation_delay(straggler) < 1
+    assert second._speculation_delay(other) is None
+
+
+def build_failing_branch_dag(**options):
+    """root -> bad -> after_bad, root -> good -> after_good"""
+
+    async def slow_task():
+        await asyncio.sleep(0.2)
+        return "slow result"
+
+    dag = TaskDAG(**options)
+    dag.add_task(Task("root", dummy_task))
+    dag.add_task(Task("bad", failing_task, dependencies={"root"}))
+    dag.add_task(Task("after_bad", dummy_task, dependencies={"bad"}))
+    dag.add_task(Task("good", slow_task, dependencies={"root"}))
+    dag.add_task(Task("after_good", dummy_task, dependencies={"good"}))
+    return dag
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_skips_unscheduled_tasks():
+    """Test fail-fast keeps partial results and skips everything not yet started"""
+    from jarvis_assistant.agents.task_dag import DAGExecutionError
+
+    dag = build_failing_branch_dag()
+
+    with pytest.raises(DAGExecutionError) as exc_info:
+        await dag.execute_dag()
+
+    assert exc_info.value.results == {"root": "dummy result", "good": "slow result"}
+    assert exc_info.value.failed == {"bad": "Task failed"}
+    assert sorted(exc_info.value.skipped) == ["after_bad", "after_good"]
+    assert dag.tasks["after_bad"].status == "skipped"
+    assert dag.get_dag_status()["task_counts"]["skipped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_can_cancel_in_flight_tasks():
+    """Test cancelling running siblings when a task fails"""
+    from jarvis_assistant.agents.task_dag import DAGExecutionError
+
+    dag = build_failing_branch_dag(cancel_in_flight=True)
+
+    with pytest.raises(DAGExecutionError) as exc_info:
+        await dag.execute_dag()
+
+    assert exc_info.value.results == {"root": "dummy result"}
+    assert dag.tasks["good"].status == "cancelled"
+    assert dag.tasks["after_good"].status == "skipped"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["continue", "best_effort"])
+async def test_independent_branches_continue_after_failure(policy):
+    """Test that continue and best-effort finish branches unaffected by the failure"""
+    from jarvis_assistant.agents.task_dag import DAGExecutionError
+
+    dag = build_failing_branch_dag(failure_policy=policy)
+
+    if policy == "continue":
+        with pytest.raises(DAGExecutionError) as exc_info:
+            await dag.execute_dag()
+        results, skipped = exc_info.value.results, exc_info.value.skipped
+    else:
+        outcome = await dag.execute_dag()
+        results, skipped = outcome["results"], outcome["skipped"]
+        assert outcome["failed"] == {"bad": "Task failed"}
+
+    assert set(results) == {"root", "good", "after_good"}
+    assert skipped == ["after_bad"]
+
+
+@pytest.mark.asyncio
+async def test_task_cancelling_itself_fails_and_skips_descendants():
+    """Test that a task raising CancelledError is a failure, not a phantom cycle"""
+    from jarvis_assistant.agents.task_dag import DAGExecutionError
+
+    async def cancels_itself():
+        raise asyncio.CancelledError()
+
+    dag = TaskDAG(failure_policy="best_effort")
+    dag.add_task(Task("cancel", cancels_itself))
+    dag.add_task(Task("after", dummy_task, dependencies={"cancel"}))
+    dag.add_task(Task("other", dummy_task))
+
+    outcome = await dag.execute_dag()
+
+    assert outcome["failed"] == {"cancel": "Task cancel was cancelled"}
+    assert outcome["skipped"] == ["after"]
+    assert set(outcome["results"]) == {"other"}
+    assert dag.tasks["cancel"].status == "failed"
+
+    dag = TaskDAG()
+    dag.add_task(Task("cancel", cancels_itself))
+    with pytest.raises(DAGExecutionError):
+        await dag.execute_dag()
+
+
+@pytest.mark.asyncio
+async def test_dependency_added_on_failed_task_skips_the_task():
+    """Test add_dependency during a run when the new dependency already failed"""
+    dag = TaskDAG(failure_policy="best_effort")
+
+    async def gate():
+        await asyncio.sleep(0.05)
+        dag.add_dependency("reduce", "bad")
+        return 1
+
+    def reduce(dep_results):
+        return dep_results
+
+    dag.add_task(Task("bad", failing_task))
+    dag.add_task(Task("gate", gate))
+    dag.add_task(Task("reduce", reduce, dependencies={"gate"}))
+    dag.add_task(Task("final", dummy_task, dependencies={"reduce"}))
+
+    outcome = await dag.execute_dag()
+
+    assert outcome["results"] == {"gate": 1}
+    assert sorted(outcome["skipped"]) == ["final", "reduce"]
+    assert dag.tasks["reduce"].status == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_resource_limits_bound_concurrent_tasks_per_resource():
+    """Test that tasks are admitted only while their resource pools have capacity"""
+    dag = TaskDAG(resources={"db_conn": 2, "cpu": 4})
+    in_use = {"db_conn": 0, "cpu": 0}
+    peak = {"db_conn": 0, "cpu": 0, "total": 0}
+
+    async def use(resource, amount):
+        in_use[resource] += amount
+        peak[resource] = max(peak[resource], in_use[resource])
+        peak["total"] = max(peak["total"], in_use["db_conn"] + in_use["cpu"] // 2)
+        await asyncio.sleep(0.05)
+        in_use[resource] -= amount
+
+    dag.add_tasks(
+        [Task(f"db{i}", use, args=["db_conn", 1], resources={"db_conn": 1}) for i in range(6)]
+        + [Task(f"cpu{i}", use, args=["cpu", 2], resources={"cpu": 2}) for i in range(2)]
+    )
+
+    result = await dag.execute_dag()
+
+    assert len(result["results"]) == 8
+    # CPU tasks run alongside the database tasks instead of queueing behind them
+    assert peak == {"db_conn": 2, "cpu": 4, "total": 4}
+    assert dag.resource_pool.available == {"db_conn": 2, "cpu": 4}
+
+
+@pytest.mark.asyncio
+async def test_resource_pool_shared_with_outside_holders():
+    """Test that a DAG waits for tokens held by another user of a shared pool"""
+    from jarvis_assistant.agents.resources import ResourcePool
+
+    pool = ResourcePool({"gpu": 1})
+    dag = TaskDAG(resources=pool)
+    dag.add_task(Task("infer", dummy_task, resources={"gpu": 1}))
+
+    assert pool.try_acquire({"gpu": 1})
+    run = asyncio.ensure_future(dag.execute_dag())
+    await asyncio.sleep(0.05)
+    assert not run.done()
+
+    pool.release({"gpu": 1})
+    result = await asyncio.wait_for(run, timeout=1)
+    assert result["results"] == {"infer": "dummy result"}
+
+
+def test_unsatisfiable_resource_requirements_are_rejected():
+    """Test validation of declared resource requirements"""
+    with pytest.raises(ValueError, match="no resource limits"):
+        TaskDAG().add_task(Task("a", dummy_task, resources={"cpu": 1}))
+
+    dag = TaskDAG(resources={"cpu": 2})
+    with pytest.raises(ValueError, match="Unknown resource: disk"):
+        dag.add_task(Task("a", dummy_task, resources={"disk": 1}))
+    with pytest.raises(ValueError, match="exceeds its capacity"):
+        dag.add_tasks([Task("b", dummy_task, resources={"cpu": 3})])
+    assert not dag.tasks
+
+
+@pytest.mark.asyncio
+async def test_task_timings_recorded_per_task(task_dag, tmp_path):
+    """Test that exact per-task timings go to the ring buffer, not metric labels"""
+    task_dag.add_task(Task("a", dummy_task))
+    task_dag.add_task(Task("b", dummy_task, dependencies={"a"}, kind="fetch"))
+    await task_dag.execute_dag()
+
+    assert [t.task_id for t in task_dag.timings.query()] == ["a", "b"]
+    (timing,) = task_dag.timings.query(kind="fetch")
+    assert timing.task_id == "b" and timing.status == "completed"
+    assert timing.duration >= 0.1
+    assert task_dag.tasks["a"].kind == "dummy_task"
+
+    assert task_dag.timings.export(tmp_path / "timings.jsonl") == 2
+    assert len((tmp_path / "timings.jsonl").read_text().splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_dag_exports_chrome_trace(tmp_path):
+    """Test that a traced run writes queue, run and retry spans in trace-event format"""
+    import json
+
+    attempts = 0
+
+    async def flaky_task():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ValueError("first attempt fails")
+        return "ok"
+
+    dag = TaskDAG(max_concurrency=1)
+    dag.add_task(Task("a", dummy_task))
+    dag.add_task(Task("b", dummy_task))
+    dag.add_task(Task("flaky", flaky_task, dependencies={"a"}, retries=1, retry_delay=0.01))
+    dag.add_task(Task("pooled", blocking_task, args=[0.01], executor="thread"))
+
+    path = tmp_path / "run.trace.json"
+    await dag.execute_dag(trace=path)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    tracks = {event["pid"]: event["args"]["name"] for event in events if event["name"] == "process_name"}
+
+    run_spans = [span for span in spans if span["cat"] == "run"]
+    assert sorted(span["name"] for span in run_spans) == ["a", "b", "flaky", "flaky", "pooled"]
+    assert {tracks[span["pid"]] for span in run_spans} == {"event loop", "thread pool"}
+    assert [span["args"]["attempt"] for span in run_spans if span["name"] == "flaky"] == [1, 2]
+    assert [span["name"] for span in spans if span["cat"] == "retry"] == ["flaky"]
+
+    # With one slot, the second of two ready tasks visibly waits in the queue
+    queue_spans = {span["name"]: span for span in spans if span["cat"] == "queue"}
+    assert max(queue_spans["a"]["dur"], queue_spans["b"]["dur"]) >= 100_000
+    dag.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_status_counters_track_transitions():
+    """Test that incremental status counts match a full scan through a run"""
+    from jarvis_assistant.agents.task_dag import DAGExecutionError
+
+    def scanned_counts(dag):
+        counts = dict.fromkeys(dag.status_snapshot()["task_counts"], 0)
+        for task in dag.tasks.values():
+            counts[task.status] += 1
+        return counts
+
+    dag = build_failing_branch_dag(failure_policy="continue")
+    snapshots = []
+
+    async def poll():
+        while True:
+            snapshots.append(dag.status_snapshot())
+            await asyncio.sleep(0.02)
+
+    poller = asyncio.ensure_future(poll())
+    with pytest.raises(DAGExecutionError):
+        await dag.execute_dag()
+    poller.cancel()
+
+    assert any("good" in snapshot["running"] for snapshot in snapshots)
+    snapshot = dag.status_snapshot()
+    assert snapshot["task_counts"] == scanned_counts(dag)
+    assert snapshot["running"] == set()
+    assert snapshot["failed"] == {"bad"}
+    assert dag.get_dag_status()["has_failed"]
+
+    dag.invalidate("root")
+    assert dag.status_snapshot()["task_counts"] == scanned_counts(dag)
+    assert dag.status_snapshot()["task_counts"]["pending"] == 5
+    assert dag.status_snapshot()["failed"] == set()
+
+
+@pytest.mark.asyncio
+async def test_polling_dag_status_during_a_run_does_not_walk_the_graph(monkeypatch):
+    """Test that completions during a run do not invalidate the cached critical path"""
+    dag = TaskDAG()
+    for i in range(5):
+        dag.add_task(Task(f"t{i}", dummy_task, dependencies={f"t{i - 1}"} if i else set()))
+
+    walks = []
+    compute = dag._compute_critical_path
+    monkeypatch.setattr(dag, "_compute_critical_path", lambda: walks.append(1) or compute())
+
+    async def poll():
+        while True:
+            dag.get_dag_status()
+            await asyncio.sleep(0.02)
+
+    poller = asyncio.ensure_future(poll())
+    await dag.execute_dag()
+    poller.cancel()
+
+    assert len(walks) == 1
+    # Durations observed during the run are used once it has finished
+    assert dag.get_dag_status()["predicted_makespan"] >= 0.5
+    assert len(walks) == 2
@@ -0,0 +1,45 @@
+import functools
+import json
+
+import pytest
+
+from jarvis_assistant.agents.task_metrics import OVERFLOW_KIND, KindLabeler, TaskTiming, TaskTimings, task_kind
+
+
+def fetch_page(url):
+    return url
+
+
+def test_kind_labeler_caps_distinct_labels():
+    """Test that kinds beyond the cap share the overflow label"""
+    labeler = KindLabeler(max_kinds=2)
+
+    assert labeler.label("fetch") == "fetch"
+    assert labeler.label("parse") == "parse"
+    assert labeler.label("store") == OVERFLOW_KIND
+    assert labeler.label("fetch") == "fetch"
+    assert len(labeler) == 2
+    assert labeler.overflowed == 1
+
+
+def test_task_kind_defaults_to_function_name():
+    assert task_kind(fetch_page) == "fetch_page"
+    assert task_kind(functools.partial(fetch_page, "x")) == "fetch_page"
+
+
+def test_timings_ring_buffer_keeps_newest_entries(tmp_path):
+    """Test that the buffer overwrites the oldest entries and can be exported"""
+    timings = TaskTimings(capacity=3)
+    for i in range(5):
+        timings.record(TaskTiming(f"task{i}", "fetch" if i % 2 else "parse", "completed", float(i), 0.5, 0, False))
+
+    assert [t.task_id for t in timings] == ["task2", "task3", "task4"]
+    assert [t.task_id for t in timings.query(kind="parse")] == ["task2", "task4"]
+    assert [t.task_id for t in timings.query(limit=1)] == ["task4"]
+
+    path = tmp_path / "timings.jsonl"
+    assert timings.export(path) == 3
+    assert json.loads(path.read_text().splitlines()[0])["task_id"] == "task2"
+
+    with pytest.raises(ValueError):
+        TaskTimings(capacity=0)
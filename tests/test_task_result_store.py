@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from jarvis_assistant.agents import task_results
+from jarvis_assistant.agents.task_results import TaskResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskResultStore(max_bytes=1000, ttl=60, spill_path=tmp_path / "results.sqlite", spill_threshold=500)
+    yield store
+    store.close()
+
+
+def test_results_within_budget_stay_in_memory(store):
+    """Test small results are served from memory"""
+    store["a"] = {"value": 1}
+    store["b"] = [1, 2, 3]
+
+    assert "a" in store
+    assert store["a"] == {"value": 1}
+    assert store.get("b") == [1, 2, 3]
+    assert store.get("missing") is None
+    assert "missing" not in store
+
+    stats = store.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["disk_entries"] == 0
+    assert stats["spill"] == 0
+
+
+def test_least_recently_used_results_spill_to_disk(store):
+    """Test eviction spills the LRU result and lookups still find it"""
+    for i in range(4):
+        store[f"t{i}"] = "x" * 200
+    store["t0"]  # t0 becomes the most recently used
+
+    store["t4"] = "x" * 200
+
+    stats = store.stats()
+    assert stats["memory_bytes"] <= 1000
+    assert stats["spill"] >= 1
+    assert "t0" in store._memory
+    assert "t1" not in store._memory
+
+    assert "t1" in store
+    assert store["t1"] == "x" * 200
+    assert store.stats()["disk_hit"] == 2
+    assert len(store) == 5
+
+
+def test_large_results_go_straight_to_disk(store):
+    """Test results over the spill threshold never occupy the memory budget"""
+    store["big"] = b"0" * 600
+
+    assert store.stats()["memory_bytes"] == 0
+    assert store["big"] == b"0" * 600
+
+
+def test_results_expire_after_ttl(store, monkeypatch):
+    """Test results older than the TTL are forgotten in both tiers"""
+    clock = [1000.0]
+    monkeypatch.setattr(task_results.time, "time", lambda: clock[0])
+    store["memory"] = 1
+    store["disk"] = b"0" * 600
+
+    clock[0] += 61
+    assert "memory" not in store
+    assert store.get("disk") is None
+
+    store["fresh"] = 2
+    stats = store.stats()
+    assert stats["memory_entries"] == 1
+    assert stats["disk_entries"] == 0
+    assert stats["expire"] == 2
+
+
+def test_overwrite_and_delete(store):
+    store["a"] = b"0" * 600
+    store["a"] = "small"
+    assert store["a"] == "small"
+    assert len(store) == 1
+
+    del store["a"]
+    assert "a" not in store
+    with pytest.raises(KeyError):
+        store["a"]
+
+
+def test_unpicklable_results_are_dropped_instead_of_spilled(store):
+    """Test a result that cannot be serialized is kept in memory until evicted"""
+    lock = threading.Lock()
+    store["lock"] = lock
+    assert store["lock"] is lock
+
+    for i in range(10):
+        store[f"t{i}"] = "x" * 200
+    assert "lock" not in store
+    assert store.stats()["drop"] == 1
+
+
+def test_spilled_results_survive_reopening(tmp_path):
+    path = tmp_path / "results.sqlite"
+    store = TaskResultStore(max_bytes=100, spill_path=path, spill_threshold=50)
+    store["a"] = "x" * 100
+    store.close()
+
+    reopened = TaskResultStore(spill_path=path)
+    assert reopened["a"] == "x" * 100
+    assert len(reopened) == 1
+    reopened.close()
+    assert path.exists()
+
+
+def test_temporary_spill_file_is_removed_on_close():
+    store = TaskResultStore(max_bytes=10)
+    store["a"] = "x" * 100
+    path = store.spill_path
+    assert path.exists()
+
+    store.close()
+    assert not path.exists()
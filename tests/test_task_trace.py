@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from jarvis_assistant.agents.task_trace import TraceRecorder
+
+
+def test_overlapping_spans_are_laid_out_on_separate_lanes():
+    """Test lane assignment so each exported thread holds non-overlapping spans"""
+    recorder = TraceRecorder(capacity=2)
+    origin = recorder.origin
+    recorder.span("workers", "a", "run", origin, origin + 3000)
+    recorder.span("workers", "b", "run", origin + 1000, origin + 2000)
+    recorder.span("workers", "c", "run", origin + 3000, origin + 4000)
+    recorder.instant("cache", "d", "cached", origin + 500)
+
+    assert len(recorder) == 4
+    events = recorder.to_trace_events()
+    spans = {event["name"]: event for event in events if event["ph"] in ("X", "i")}
+
+    assert spans["a"]["tid"] != spans["b"]["tid"]
+    # c starts once a lane is free again instead of opening a third one
+    lanes = [e for e in events if e["name"] == "thread_name" and e["pid"] == spans["a"]["pid"]]
+    assert len(lanes) == 2
+    assert spans["b"]["ts"] == 1.0 and spans["b"]["dur"] == 1.0
+    assert spans["d"]["ph"] == "i"
+    assert spans["d"]["pid"] != spans["a"]["pid"]
+
+
+def test_export_writes_trace_event_json(tmp_path):
+    recorder = TraceRecorder()
+    recorder.span("queue", "a", "queue", recorder.origin, recorder.origin + 10, {"attempt": 1})
+
+    path = tmp_path / "trace.json"
+    assert recorder.export(path) == 1
+    trace = json.loads(path.read_text())
+    assert trace["displayTimeUnit"] == "ms"
+    assert {"process_name", "thread_name", "a"} <= {event["name"] for event in trace["traceEvents"]}
+
+    recorder.clear()
+    assert len(recorder) == 0
+    with pytest.raises(ValueError):
+        TraceRecorder(capacity=0)
@@ -0,0 +1,112 @@
+import json
+import uuid
+
+import pytest
+
+from jarvis_assistant.agents import wire_protocol
+from jarvis_assistant.agents.wire_protocol import (
+    CODEC_JSON,
+    CODEC_MSGPACK,
+    HEADER,
+    codec_for,
+    decode_frame,
+    encode_frame,
+    read_header,
+    select_subprotocol,
+    supported_subprotocols,
+    transcode,
+)
+
+MESSAGE = {
+    "sender": "task-executor",
+    "message_type": "browser_command",
+    "target": "browsers",
+    "correlation_id": uuid.uuid4().hex,
+    "content": {"command": "navigate", "url": "https://example.com"},
+}
+
+
+def test_frame_round_trip():
+    frame = encode_frame(MESSAGE)
+    assert decode_frame(frame) == MESSAGE
+
+
+def test_header_is_read_without_the_payload():
+    """Test routers can read type, target and correlation id from the header alone"""
+    frame = encode_frame(MESSAGE)
+    header = read_header(frame[: HEADER.size])
+
+    assert header.message_type == "browser_command"
+    assert header.target == "browsers"
+    assert header.correlation_id == MESSAGE["correlation_id"]
+    assert header.codec == CODEC_JSON
+
+
+def test_missing_target_and_correlation_id_use_defaults():
+    message = {"sender": "ui", "message_type": "task_update", "content": {}}
+    header = read_header(encode_frame(message))
+
+    assert header.target == "all"
+    assert header.correlation_id is None
+    assert "correlation_id" not in decode_frame(encode_frame(message))
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"message_type": "unknown"},
+        {"target": "nowhere"},
+        {"correlation_id": "abc"},
+        {"correlation_id": "zz" * 16},
+        {"correlation_id": 42},
+    ],
+)
+def test_unencodable_headers_are_rejected(change):
+    with pytest.raises(ValueError):
+        encode_frame({**MESSAGE, **change})
+
+
+def test_invalid_frames_are_rejected():
+    with pytest.raises(ValueError):
+        read_header(b"JW")
+    with pytest.raises(ValueError):
+        read_header(b"XX" + encode_frame(MESSAGE)[2:])
+
+
+def test_subprotocol_negotiation(monkeypatch):
+    monkeypatch.setattr(wire_protocol, "msgpack", None)
+    assert supported_subprotocols() == ("jarvis.v1.json",)
+    assert select_subprotocol(["jarvis.v1.msgpack", "jarvis.v1.json"]) == "jarvis.v1.json"
+    assert select_subprotocol(["chat"]) is None
+    assert codec_for("jarvis.v1.json") == CODEC_JSON
+    assert codec_for(None) is None
+
+
+def test_msgpack_frames():
+    pytest.importorskip("msgpack")
+    frame = encode_frame(MESSAGE, CODEC_MSGPACK)
+
+    assert read_header(frame).codec == CODEC_MSGPACK
+    assert decode_frame(frame) == MESSAGE
+    assert select_subprotocol(supported_subprotocols()) == "jarvis.v1.msgpack"
+
+
+def test_transcode_between_text_and_frames():
+    text = json.dumps(MESSAGE)
+    frame = encode_frame(MESSAGE)
+
+    assert transcode(text, None) is text
+    assert transcode(frame, CODEC_JSON) is frame
+    assert decode_frame(transcode(text, CODEC_JSON)) == MESSAGE
+    assert json.loads(transcode(frame, None)) == MESSAGE
+
+
+@pytest.mark.parametrize(
+    "change", [{"message_type": "custom_event"}, {"target": "agent-7"}, {"correlation_id": "request-1"}]
+)
+def test_messages_without_a_header_representation_stay_json_text(change):
+    """Test that binary connections get JSON text for messages a frame cannot carry"""
+    text = json.dumps({**MESSAGE, **change})
+
+    assert transcode(text, CODEC_JSON) is text
+    assert transcode(text, None) is text
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from jarvis_assistant.agents.ws_multiplexer import RequestMultiplexer
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_receive_their_own_responses():
+    """Test that out-of-order responses resolve the request with the same correlation id"""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    mux = RequestMultiplexer(send)
+    first = asyncio.ensure_future(mux.request({"content": {"command": "A"}}, timeout=1))
+    second = asyncio.ensure_future(mux.request({"content": {"command": "B"}}, timeout=1))
+    await asyncio.sleep(0)
+
+    assert len(mux) == 2
+    assert sent[0]["correlation_id"] != sent[1]["correlation_id"]
+
+    assert not mux.dispatch({"message_type": "task_request", "content": {}})
+    assert mux.dispatch({"correlation_id": sent[1]["correlation_id"], "content": {"result": "B"}})
+    assert mux.dispatch({"correlation_id": sent[0]["correlation_id"], "content": {"result": "A"}})
+
+    assert (await first)["content"] == {"result": "A"}
+    assert (await second)["content"] == {"result": "B"}
+    assert len(mux) == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_time_out_independently_and_fail_on_disconnect():
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    mux = RequestMultiplexer(send)
+    with pytest.raises(asyncio.TimeoutError):
+        await mux.request({"content": {}}, timeout=0.01)
+    assert len(mux) == 0
+    # A late response to a timed-out request is ignored
+    assert not mux.dispatch({"correlation_id": sent[0]["correlation_id"], "content": {}})
+
+    pending = asyncio.ensure_future(mux.request({"content": {}}, timeout=1))
+    await asyncio.sleep(0)
+    mux.fail_all(ConnectionError("closed"))
+    with pytest.raises(ConnectionError):
+        await pending